@@ -405,6 +405,7 @@ if is_fully_configured:
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
     app.config['JSON_SORT_KEYS'] = False
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Upper bound for any request body
     app.json.compact = False
 
     # Ensure database has proper permissions before initializing
@@ -764,7 +765,7 @@ def init_app():
             
             # Import db here to ensure it's only used when NUT is configured
             from core.db.ups import db
-            from core.db.initializer import init_database
+            from core.db.initializer import init_database, ensure_query_indexes
             from core.db.model_classes import register_models_for_global_access
             
             # Check if database file exists, if not or if it's empty, recreate it
@@ -807,6 +808,8 @@ def init_app():
                     logger.info("✅ Database timestamp columns are correctly named")
                 else:
                     logger.info("✅ Database timestamp columns have been patched")
+                    # Indexes reference the patched column names
+                    ensure_query_indexes(db)
             except Exception as e:
                 logger.error(f"❌ Error checking timestamp columns: {str(e)}")
                 logger.warning("⚠️ Continuing with application startup despite timestamp column error")
@@ -27,6 +27,43 @@ def get_app_timezone():
     import pytz
     return lambda: pytz.UTC
 
+# Indexes backing the hot lookups: latest dynamic sample, per-UPS event history
+# and the (usually empty) set of still-open events. Partial indexes are SQLite 3.8+.
+QUERY_INDEXES = {
+    'ups_dynamic_data': (
+        "CREATE INDEX IF NOT EXISTS idx_ups_dynamic_data_timestamp_utc "
+        "ON ups_dynamic_data (timestamp_utc)",
+    ),
+    'ups_events': (
+        "CREATE INDEX IF NOT EXISTS idx_ups_events_name_type_ts "
+        "ON ups_events (ups_name, event_type, timestamp_utc)",
+        "CREATE INDEX IF NOT EXISTS idx_ups_events_open "
+        "ON ups_events (ups_name, event_type) WHERE timestamp_utc_end IS NULL",
+    ),
+}
+
+def ensure_query_indexes(db):
+    """
+    Create the query indexes on existing tables if they are missing.
+    
+    create_all() never adds indexes to tables that already exist, so this
+    runs on every start; CREATE INDEX IF NOT EXISTS makes it idempotent.
+    
+    Args:
+        db: SQLAlchemy database instance
+    """
+    try:
+        existing_tables = set(inspect(db.engine).get_table_names())
+        with db.engine.begin() as conn:
+            for table_name, statements in QUERY_INDEXES.items():
+                if table_name not in existing_tables:
+                    continue
+                for statement in statements:
+                    conn.execute(text(statement))
+        logger.info("✅ Query indexes verified")
+    except Exception as e:
+        logger.warning(f"⚠️ Error creating query indexes: {str(e)}")
+
 def init_database(app, db):
     """
     Initialize the database with all tables using ORM.
@@ -105,6 +142,7 @@ def init_database(app, db):
         logger.info("🏗️ Step 6: Creating remaining tables...")
         db.create_all()
         logger.info("✅ All tables created successfully")
+        ensure_query_indexes(db)
         
         # Step 7: Register models in UPS module to ensure they're available globally
         logger.info("🔗 Step 7: Registering models globally...")
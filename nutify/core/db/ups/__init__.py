@@ -4,8 +4,11 @@ This module provides functions and classes for working with UPS data.
 """
 
 import logging
+import sqlite3
 from flask_socketio import SocketIO
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from core.logger import database_logger as logger
 
 logger.info("💾 Initializing UPS database module")
@@ -13,6 +16,28 @@ logger.info("💾 Initializing UPS database module")
 # Create database instance
 db = SQLAlchemy()
 
+# Applied to every new SQLite connection. WAL lets the poller, the web workers and
+# the upsmon notifier read while another process writes, and with WAL
+# synchronous=NORMAL only fsyncs at checkpoints while staying crash-safe.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to each new SQLite DBAPI connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 # Import core components from submodules
 from core.db.ups.errors import (
     UPSError, UPSConnectionError, UPSCommandError, UPSDataError
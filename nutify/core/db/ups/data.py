@@ -6,14 +6,22 @@ This module provides functions for retrieving and processing UPS data.
 import subprocess
 import logging
 import json
+import threading
+import time
 from datetime import datetime, timedelta
 from sqlalchemy import func, text
 from flask import current_app
 
 from core.logger import database_logger as logger
 from core.db.ups.errors import UPSDataError, UPSConnectionError
-from core.db.ups.utils import UPSData, ups_lock, ups_config, calculate_realpower
-from core.settings import UPSC_BIN
+from core.db.ups.utils import UPSData, ups_lock, ups_config, nut_session, calculate_realpower
+from core.settings import UPSC_BIN, UPSC_USE_SUBPROCESS
+
+# Seconds a successful NUT read (socket session or upsc) is reused before reading again
+UPS_DATA_CACHE_TTL = 0.5
+
+# Maximum number of concurrent NUT reads, on either the socket session or the upsc path
+upsc_slots = threading.BoundedSemaphore(4)
 
 def get_available_variables():
     """
@@ -34,21 +42,28 @@ def get_available_variables():
             logger.error(f"UPS configuration not initialized: {ups_config}")
             raise ValueError("UPS configuration not initialized. Make sure configure_ups() is called before using this function.")
             
+        # Snapshot the configuration under ups_lock, then run upsc outside it
         with ups_lock:
+            command = ups_config.command
+            target = ups_config.target
+            timeout = ups_config.timeout
+        
+        with upsc_slots:
             result = subprocess.run(
-                [ups_config.command, f'{ups_config.name}@{ups_config.host}'],
-                capture_output=True,
-                text=True,
-                timeout=ups_config.timeout
+                [command, target],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=timeout,
+                close_fds=False
             )
 
-            variables = {}
-            for line in result.stdout.splitlines():
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    variables[key.strip()] = value.strip()
-            
-            return variables
+        variables = {}
+        for line in result.stdout.decode('utf-8', errors='replace').splitlines():
+            if ':' in line:
+                key, value = line.split(':', 1)
+                variables[key.strip()] = value.strip()
+        
+        return variables
 
     except Exception as e:
         logger.error(f"Error in get_available_variables: {str(e)}")
@@ -86,44 +101,54 @@ def get_ups_data():
             logger.warning(f"⚠️ {error_msg}")
             return data
         
+        # Reuse a very recent reading instead of spawning upsc again
+        cached_at, cached_data = ups_config.data_cache
+        if cached_data is not None and time.monotonic() - cached_at < UPS_DATA_CACHE_TTL:
+            return UPSData(cached_data._data)
+        
+        # Hold ups_lock only while taking a consistent snapshot of the configuration
         with ups_lock:
             # Ensure configuration is loaded from database if available
             if not ups_config.is_initialized():
                 ups_config.load_from_database()
-            
-            # Always use upsc command directly from settings
-            upsc_command = UPSC_BIN
-            
-            # Check if we have the required parameters
-            if not ups_config.name or not ups_config.host:
-                msg = f"Missing UPS parameters: name={ups_config.name}, host={ups_config.host}"
-                logger.error(msg)
-                data = UPSData({
-                    'ups_status': 'ERROR',
-                    'battery_charge': 0.0,
-                    'battery_runtime': 0,
-                    'input_voltage': 0.0,
-                    'output_voltage': 0.0,
-                    'error': msg
-                })
-                return data
-            
-            # Construct the UPS target identifier
-            ups_target = f"{ups_config.name}@{ups_config.host}"
-            logger.debug(f"Running UPS command: {upsc_command} {ups_target}")
-            
-            try:
-                # Run the command
-                result = subprocess.run(
-                    [upsc_command, ups_target], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=10
-                )
+            ups_name = ups_config.name
+            ups_host = ups_config.host
+            ups_target = ups_config.target
+        
+        # Always use upsc command directly from settings
+        upsc_command = UPSC_BIN
+        
+        # Check if we have the required parameters
+        if not ups_name or not ups_host:
+            msg = f"Missing UPS parameters: name={ups_name}, host={ups_host}"
+            logger.error(msg)
+            data = UPSData({
+                'ups_status': 'ERROR',
+                'battery_charge': 0.0,
+                'battery_runtime': 0,
+                'input_voltage': 0.0,
+                'output_voltage': 0.0,
+                'error': msg
+            })
+            return data
+        
+        try:
+            if UPSC_USE_SUBPROCESS:
+                logger.debug(f"Running UPS command: {upsc_command} {ups_target}")
+                
+                # Run the command; concurrent upsc clients are capped, not serialized
+                with upsc_slots:
+                    result = subprocess.run(
+                        [upsc_command, ups_target], 
+                        stdout=subprocess.PIPE, 
+                        stderr=subprocess.PIPE, 
+                        timeout=10,
+                        close_fds=False
+                    )
                 
                 # Check if command failed
                 if result.returncode != 0:
-                    error_msg = f"UPS command failed: {result.stderr.strip()}"
+                    error_msg = f"UPS command failed: {result.stderr.decode('utf-8', errors='replace').strip()}"
                     logger.error(error_msg)
                     data = UPSData({
                         'ups_status': 'ERROR',
@@ -137,66 +162,72 @@ def get_ups_data():
                 
                 # Process the command output
                 raw_data = {}
-                for line in result.stdout.splitlines():
+                for line in result.stdout.decode('utf-8', errors='replace').splitlines():
                     if ':' in line:
                         key, value = line.split(':', 1)
                         raw_data[key.strip()] = value.strip()
-                
-                if not raw_data:
-                    logger.warning("No data returned from UPS command")
-                    data = UPSData({
-                        'ups_status': 'NO_DATA',
-                        'battery_charge': 0.0,
-                        'battery_runtime': 0,
-                        'input_voltage': 0.0,
-                        'output_voltage': 0.0,
-                        'error': 'No data returned from UPS'
-                    })
-                    return data
-                
-                # Calculate real power if needed
-                raw_data = calculate_realpower(raw_data)
-                
-                # Transform NUT format keys to database format (from dot notation to underscore)
-                transformed_data = {}
-                for key, value in raw_data.items():
-                    db_key = key.replace('.', '_')
-                    try:
-                        float_value = float(value)
-                        transformed_data[db_key] = float_value
-                    except ValueError:
-                        transformed_data[db_key] = value
-                
-                # Create and return the data object
-                data = UPSData(transformed_data)
-                return data
-                
-            except subprocess.TimeoutExpired:
-                error_msg = "UPS command timed out after 10 seconds"
-                logger.error(error_msg)
-                data = UPSData({
-                    'ups_status': 'TIMEOUT',
-                    'battery_charge': 0.0,
-                    'battery_runtime': 0,
-                    'input_voltage': 0.0,
-                    'output_voltage': 0.0,
-                    'error': error_msg
-                })
-                return data
-                
-            except Exception as e:
-                error_msg = f"Error executing UPS command: {str(e)}"
-                logger.error(error_msg)
+            else:
+                # Query upsd over the persistent NUT session
+                logger.debug(f"Reading UPS variables over NUT session: {ups_target}")
+                with upsc_slots:
+                    raw_data = nut_session.list_vars(ups_name, ups_host, timeout=10)
+            
+            if not raw_data:
+                logger.warning("No data returned from UPS command")
                 data = UPSData({
-                    'ups_status': 'ERROR',
+                    'ups_status': 'NO_DATA',
                     'battery_charge': 0.0,
                     'battery_runtime': 0,
                     'input_voltage': 0.0,
                     'output_voltage': 0.0,
-                    'error': error_msg
+                    'error': 'No data returned from UPS'
                 })
                 return data
-    
+            
+            # Calculate real power if needed
+            raw_data = calculate_realpower(raw_data)
+            
+            # Transform NUT format keys to database format (from dot notation to underscore)
+            transformed_data = {}
+            for key, value in raw_data.items():
+                db_key = key.replace('.', '_')
+                try:
+                    float_value = float(value)
+                    transformed_data[db_key] = float_value
+                except ValueError:
+                    transformed_data[db_key] = value
+            
+            # Create and return the data object
+            data = UPSData(transformed_data)
+            ups_config.data_cache = (time.monotonic(), UPSData(transformed_data))
+            return data
+            
+        except (subprocess.TimeoutExpired, TimeoutError):
+            error_msg = "UPS command timed out after 10 seconds"
+            logger.error(error_msg)
+            data = UPSData({
+                'ups_status': 'TIMEOUT',
+                'battery_charge': 0.0,
+                'battery_runtime': 0,
+                'input_voltage': 0.0,
+                'output_voltage': 0.0,
+                'error': error_msg
+            })
+            return data
+            
+        except Exception as e:
+            error_msg = f"Error executing UPS command: {str(e)}"
+            logger.error(error_msg)
+            data = UPSData({
+                'ups_status': 'ERROR',
+                'battery_charge': 0.0,
+                'battery_runtime': 0,
+                'input_voltage': 0.0,
+                'output_voltage': 0.0,
+                'error': error_msg
+            })
+            return data
+
     except Exception as e:
         error_msg = f"Error getting UPS data: {str(e)}"
         logger.error(error_msg)
@@ -210,6 +241,27 @@ def get_ups_data():
         })
         return data
 
+_HISTORICAL_SKIP_COLUMNS = ('id', 'timestamp')
+
+def _float_or_value(value):
+    """Convert a string value to float, keeping it unchanged if it is not numeric"""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+def _historical_converter(column):
+    """Pick the value converter for a column from its SQL type"""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return _float_or_value
+    if issubclass(python_type, (int, float)):
+        return float
+    if issubclass(python_type, str):
+        return _float_or_value
+    return lambda value: value
+
 def get_historical_data(db, UPSData, start_time, end_time):
     """
     Get the historical data of the UPS in a time range
@@ -228,28 +280,25 @@ def get_historical_data(db, UPSData, start_time, end_time):
             UPSData.timestamp_utc.between(start_time, end_time)
         ).order_by(UPSData.timestamp_utc.asc())
         
+        # Resolve the per-column conversion once instead of per (row, column)
+        converters = [
+            (column.name, _historical_converter(column))
+            for column in UPSData.__table__.columns
+            if column.name not in _HISTORICAL_SKIP_COLUMNS
+        ]
+        
         result = []
         for entry in data.all():
             record = {'timestamp': entry.timestamp_utc.isoformat()}
             
-            # Convert all fields to float where possible
-            for column in UPSData.__table__.columns:
-                if column.name not in ['id', 'timestamp']:
-                    try:
-                        value = getattr(entry, column.name)
-                        if value is not None:
-                            if isinstance(value, (int, float)):
-                                record[column.name] = float(value)
-                            elif isinstance(value, str):
-                                try:
-                                    record[column.name] = float(value)
-                                except ValueError:
-                                    record[column.name] = value
-                            else:
-                                record[column.name] = value
-                    except (ValueError, TypeError, AttributeError) as e:
-                        logger.debug(f"Skipping field {column.name}: {e}")
-                        continue
+            for name, convert in converters:
+                value = getattr(entry, name, None)
+                if value is None:
+                    continue
+                try:
+                    record[name] = convert(value)
+                except (ValueError, TypeError) as e:
+                    logger.debug(f"Skipping field {name}: {e}")
             
             result.append(record)
         
@@ -277,19 +326,20 @@ def calculate_daily_power(db, UPSDynamicData):
         start_date = previous_day.replace(hour=0, minute=0, second=0, microsecond=0)
         end_date = start_date + timedelta(days=1)
         
-        # Get all hourly data of the previous day
-        hourly_data = UPSDynamicData.query.filter(
+        # Let the database average the hourly values of the previous day
+        daily_power = db.session.query(
+            func.avg(UPSDynamicData.ups_realpower_hrs)
+        ).filter(
             UPSDynamicData.timestamp_utc >= start_date,
             UPSDynamicData.timestamp_utc < end_date,
             UPSDynamicData.ups_realpower_hrs.isnot(None)
-        ).all()
+        ).scalar()
         
-        if not hourly_data:
+        if daily_power is None:
             logger.warning("No hourly data available for daily aggregation")
             return
         
-        # Calculate the daily average power
-        daily_power = sum([d.ups_realpower_hrs for d in hourly_data]) / len(hourly_data)
+        daily_power = float(daily_power)
         
         # Create or update the daily record
         daily_record = UPSDynamicData(
@@ -4,14 +4,16 @@ This module provides utility functions for UPS operations.
 """
 
 import logging
+import socket
 import subprocess
 import threading
 import pytz
 from datetime import datetime
 from flask import current_app
 
-from core.settings import UPSC_BIN
+from core.settings import UPSC_BIN, NUT_PORT
 from core.logger import database_logger as logger
+from core.db.ups.errors import UPSConnectionError, UPSDataError
 # Import nut_parser for configuration file access
 from core.db.nut_parser import get_ups_connection_params, get_nut_configuration
 
@@ -33,6 +35,10 @@ class UPSConfig:
             cls._instance.db_config = None
             cls._instance.config_files_checked = False
             cls._instance.config_source = "uninitialized"
+            # Precomputed 'name@host' target passed to upsc
+            cls._instance.target = None
+            # Last successful UPS reading as a (monotonic timestamp, UPSData) tuple
+            cls._instance.data_cache = (0.0, None)
         return cls._instance
     
     def configure(self, host, name, command, timeout):
@@ -41,7 +47,10 @@ class UPSConfig:
         self.name = name
         self.command = command
         self.timeout = timeout
+        self.target = f"{name}@{host}"
         self.initialized = bool(host and name and command)
+        self.data_cache = (0.0, None)
+        nut_session.close()
         # Don't override config_source here as it's set by configure_ups function
         logger.debug(f"🔌 UPS configuration updated in singleton: host={self.host}, name={self.name}, command={self.command}, timeout={self.timeout}, initialized={self.initialized}, source={getattr(self, 'config_source', 'unknown')}")
         return self.initialized
@@ -78,6 +87,7 @@ class UPSConfig:
                 self.name = name
                 self.command = UPSC_BIN
                 self.timeout = 10  # Default timeout
+                self.target = f"{name}@{host}"
                 self.initialized = True
                 self.config_source = "nut_files"  # Track the source of configuration
                 
@@ -113,7 +123,121 @@ class UPSConfig:
         source = getattr(self, 'config_source', 'unknown')
         return f"UPSConfig(host={self.host}, name={self.name}, command={self.command}, timeout={self.timeout}, initialized={self.initialized}, source={source})"
 
-# Global instance
+class NutSession:
+    """
+    Persistent connection to upsd speaking the NUT network protocol.
+    
+    Replaces a fork/exec of upsc per poll with a single TCP connection that is
+    reused across calls. The connection is torn down on any socket error and
+    reopened lazily on the next request.
+    """
+    
+    def __init__(self):
+        self._sock = None
+        self._reader = None
+        self._address = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _parse_host(host):
+        """Split an optional ':port' suffix from the UPS host"""
+        if host.count(':') == 1:
+            hostname, port = host.split(':', 1)
+            if port.isdigit():
+                return hostname, int(port)
+        return host, int(NUT_PORT)
+    
+    def _connect(self, address, timeout):
+        self._sock = socket.create_connection(address, timeout=timeout)
+        self._reader = self._sock.makefile('r', encoding='utf-8', newline='\n')
+        self._address = address
+        logger.debug(f"🔌 Opened NUT session to {address[0]}:{address[1]}")
+    
+    def _close(self):
+        for resource in (self._reader, self._sock):
+            if resource is not None:
+                try:
+                    resource.close()
+                except OSError:
+                    pass
+        self._sock = None
+        self._reader = None
+        self._address = None
+    
+    def close(self):
+        """Close the connection; the next call reconnects"""
+        with self._lock:
+            self._close()
+    
+    @staticmethod
+    def _parse_var_line(line, prefix):
+        """Parse 'VAR <ups> <name> "<value>"' into (name, value)"""
+        name, _, quoted = line[len(prefix):].partition(' ')
+        value = quoted.strip()
+        if value.startswith('"') and value.endswith('"'):
+            value = value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+        return name, value
+    
+    def _list_vars(self, ups_name):
+        self._sock.sendall(f"LIST VAR {ups_name}\n".encode('utf-8'))
+        
+        header = self._reader.readline()
+        if not header:
+            raise ConnectionError("NUT server closed the connection")
+        header = header.strip()
+        if header.startswith('ERR'):
+            raise UPSDataError(f"NUT server error for {ups_name}: {header}")
+        
+        prefix = f"VAR {ups_name} "
+        end_marker = f"END LIST VAR {ups_name}"
+        variables = {}
+        for line in self._reader:
+            line = line.strip()
+            if line == end_marker:
+                return variables
+            if line.startswith(prefix):
+                name, value = self._parse_var_line(line, prefix)
+                variables[name] = value
+        raise ConnectionError("NUT server closed the connection during LIST VAR")
+    
+    def list_vars(self, ups_name, host, timeout=10):
+        """
+        Get all variables of a UPS, like 'upsc ups@host'
+        
+        Args:
+            ups_name: Name of the UPS in the NUT system
+            host: Host of the NUT server, optionally with ':port'
+            timeout: Socket timeout in seconds
+        
+        Returns:
+            dict: Variable names (dot notation) mapped to their string values
+        
+        Raises:
+            UPSConnectionError: If the NUT server cannot be reached
+            UPSDataError: If the NUT server answers with an error
+        """
+        address = self._parse_host(host)
+        with self._lock:
+            # Retry once so a connection dropped by upsd is transparently reopened
+            for attempt in range(2):
+                try:
+                    if self._sock is None or self._address != address:
+                        self._close()
+                        self._connect(address, timeout)
+                    return self._list_vars(ups_name)
+                except UPSDataError:
+                    raise
+                except socket.timeout:
+                    self._close()
+                    raise
+                except OSError as e:
+                    self._close()
+                    if attempt:
+                        raise UPSConnectionError(f"Cannot communicate with NUT server {address[0]}:{address[1]}: {str(e)}")
+                    logger.debug(f"NUT session error, reconnecting: {str(e)}")
+
+# Global instances
+nut_session = NutSession()
 ups_config = UPSConfig()
 
 # Locks for synchronization
@@ -147,6 +271,11 @@ class DotDict:
 # Alias DotDict as UPSData for better semantics
 UPSData = DotDict
 
+# Candidate keys (dot and underscore notation) probed by calculate_realpower
+_RP_KEYS = ('ups.realpower', 'ups_realpower')
+_LOAD_KEYS = ('ups.load', 'ups_load')
+_NOM_KEYS = ('ups.realpower.nominal', 'ups_realpower_nominal')
+
 def configure_ups(host, name, command, timeout, source="api_call"):
     """
     Configure the UPS connection parameters
@@ -260,40 +389,25 @@ def calculate_realpower(data):
     """
     try:
         # Check both possible key formats (with dot or underscore)
-        dot_key = 'ups.realpower'
-        underscore_key = 'ups_realpower'
+        dot_key, underscore_key = _RP_KEYS
         
         # Get current value (if exists)
-        current_value = None
-        if dot_key in data:
-            current_value = data[dot_key]
-        elif underscore_key in data:
-            current_value = data[underscore_key]
+        current_value = next((data[k] for k in _RP_KEYS if k in data), None)
         
         # Calculate only if value doesn't exist or is 0
         if current_value is None or float(current_value) == 0:
             # Get load value, checking both formats
-            load_value = None
-            if 'ups.load' in data:
-                load_value = data['ups.load']
-            elif 'ups_load' in data:
-                load_value = data['ups_load']
-            
+            load_value = next((data[k] for k in _LOAD_KEYS if k in data), None)
             load_percent = float(load_value if load_value is not None else 0)
             
             # Get nominal power with priority:
             # 1. Directly from UPS data
             # 2. From database
             # 3. Default value as last resort
-            nominal_value = None
-            
-            # First check UPS data - highest priority
-            if 'ups.realpower.nominal' in data:
-                nominal_value = data['ups.realpower.nominal']
-                logger.debug(f"⚡ Using nominal power from UPS data (ups.realpower.nominal): {nominal_value}W")
-            elif 'ups_realpower_nominal' in data:
-                nominal_value = data['ups_realpower_nominal']
-                logger.debug(f"⚡ Using nominal power from UPS data (ups_realpower_nominal): {nominal_value}W")
+            nominal_key = next((k for k in _NOM_KEYS if k in data), None)
+            nominal_value = data[nominal_key] if nominal_key is not None else None
+            if nominal_key is not None:
+                logger.debug(f"⚡ Using nominal power from UPS data ({nominal_key}): {nominal_value}W")
             
             # If not found in UPS data, try database
             if nominal_value is None:
@@ -318,8 +432,7 @@ def calculate_realpower(data):
                 realpower = (nominal_power * load_percent) / 100
                 
                 # Update both key versions for compatibility
-                data[dot_key] = str(round(realpower, 2))
-                data[underscore_key] = str(round(realpower, 2))
+                data[dot_key] = data[underscore_key] = str(round(realpower, 2))
                 
                 logger.debug(f"Calculated realpower: {realpower:.2f}W (nominal={nominal_power}W, load={load_percent}%)")
             else:
@@ -1,8 +1,11 @@
-from flask import jsonify, request, current_app
-from datetime import datetime, timedelta, timezone, time
+from flask import jsonify, request, current_app, Response
+from datetime import datetime, timedelta, timezone, time, date
+from functools import lru_cache
 from sqlalchemy import func
 import pytz
 import random
+import time as time_module
+import orjson
 
 from core.db.ups import (
     get_ups_model, data_lock, VariableConfig
@@ -15,6 +18,65 @@ from .energy import (
     get_cost_trend_for_range, format_cost_series, calculate_energy_stats, format_realtime_data
 )
 
+def _json(payload, status=200):
+    """JSON response serialized with orjson, for the large energy series payloads"""
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
+# Years with data change at most once a year: reuse the result for a few hours
+AVAILABLE_YEARS_TTL = 6 * 3600
+_available_years_cache = (0.0, None)
+
+@lru_cache(maxsize=1024)
+def _parse_date(value):
+    """Parse a 'YYYY-MM-DD' request parameter (cached, C-level ISO parser)"""
+    return date.fromisoformat(value)
+
+@lru_cache(maxsize=1024)
+def _parse_hm(value):
+    """Parse a 'HH:MM' request parameter (cached, C-level ISO parser)"""
+    return time.fromisoformat(value)
+
+# Columns read by format_cost_series; projecting them avoids hydrating full ORM rows
+_COST_SERIES_COLUMNS = (
+    'timestamp_utc', 'ups_realpower', 'ups_realpower_hrs', 'ups_load', 'ups_realpower_nominal'
+)
+
+def _query_cost_series_rows(UPSDynamicData, start_time, end_time, batch_size=1000):
+    """
+    Fetch the cost series columns for a UTC range, hydrated in batches.
+    Only columns defined on the dynamic model are selected.
+    """
+    columns = [
+        getattr(UPSDynamicData, name) for name in _COST_SERIES_COLUMNS
+        if hasattr(UPSDynamicData, name)
+    ]
+    query = UPSDynamicData.query\
+        .with_entities(*columns)\
+        .filter(
+            UPSDynamicData.timestamp_utc >= start_time,
+            UPSDynamicData.timestamp_utc <= end_time
+        )\
+        .order_by(UPSDynamicData.timestamp_utc.asc())\
+        .yield_per(batch_size)
+    return list(query)
+
+def _has_column_data(data, *columns):
+    """
+    Check in a single pass whether any row has a value for all the given columns.
+    Columns missing from the (dynamic) model are treated as having no value.
+    """
+    for row in data:
+        for column in columns:
+            if getattr(row, column, None) is None:
+                break
+        else:
+            return True
+    return False
+
 def register_api_routes(app):
     """Register all API routes for the energy section"""
     
@@ -70,7 +132,7 @@ def register_api_routes(app):
             # Check if we have at least 30 data points (minimum threshold)
             if data_count < 30:
                 logger.debug(f"Insufficient data points: {data_count} < 30")
-                return jsonify({'has_data': False})
+                return _json({'has_data': False})
             
             # Check if we have data spanning at least 50 minutes
             if data:
@@ -89,14 +151,14 @@ def register_api_routes(app):
                 # Add additional debug output
                 logger.debug(f"Final decision - has_sufficient_data: {has_sufficient_data}")
                 
-                return jsonify({'has_data': has_sufficient_data})
+                return _json({'has_data': has_sufficient_data})
             
             logger.debug("No data found after filtering")
-            return jsonify({'has_data': False})
+            return _json({'has_data': False})
             
         except Exception as e:
             logger.error(f"Error checking for hour data: {str(e)}")
-            return jsonify({'has_data': False, 'error': str(e)})
+            return _json({'has_data': False, 'error': str(e)})
 
     @app.route('/api/energy/cost-trend')
     def get_cost_trend_data():
@@ -118,8 +180,8 @@ def register_api_routes(app):
                 
                 try:
                     # Parse dates in the configured timezone
-                    from_date_local = datetime.strptime(from_time, '%Y-%m-%d').date()
-                    to_date_local = datetime.strptime(to_time, '%Y-%m-%d').date()
+                    from_date_local = _parse_date(from_time)
+                    to_date_local = _parse_date(to_time)
                     
                     # Create start and end datetime objects in the local timezone
                     start_time_local = tz.localize(datetime.combine(from_date_local, time.min))  # Start of first day
@@ -144,7 +206,7 @@ def register_api_routes(app):
                     
                 except ValueError as e:
                     logger.error(f"Invalid date format: {str(e)}")
-                    return jsonify({
+                    return _json({
                         'success': False,
                         'error': f"Invalid date format: {str(e)}"
                     })
@@ -181,7 +243,7 @@ def register_api_routes(app):
                 logger.debug(f"REALTIME query found {len(data)} records")
                 
                 # Check if we have ups_realpower data
-                if data and hasattr(data[0], 'ups_realpower') and any(d.ups_realpower is not None for d in data):
+                if _has_column_data(data, 'ups_realpower'):
                     logger.debug(f"REALTIME using ups_realpower data")
                     series = format_cost_series(data, 'realtime')
                 else:
@@ -199,11 +261,11 @@ def register_api_routes(app):
                 
                 # Parse time strings
                 try:
-                    from_time_obj = datetime.strptime(from_time, '%H:%M').time()
-                    to_time_obj = datetime.strptime(to_time, '%H:%M').time()
+                    from_time_obj = _parse_hm(from_time)
+                    to_time_obj = _parse_hm(to_time)
                 except ValueError as e:
                     logger.error(f"Invalid time format: {str(e)}")
-                    return jsonify({
+                    return _json({
                         'success': False,
                         'error': f"Invalid time format: {str(e)}"
                     })
@@ -239,7 +301,7 @@ def register_api_routes(app):
                 # --- Start Strict Priority Logic (copied from DAY block) ---
                 series = []
                 # 1. Try hrs
-                has_hrs_data = data and hasattr(data[0], 'ups_realpower_hrs') and any(d.ups_realpower_hrs is not None for d in data)
+                has_hrs_data = _has_column_data(data, 'ups_realpower_hrs')
                 if has_hrs_data:
                     logger.debug("TODAY (logic copied from DAY) trying 'hrs' data...")
                     series = format_cost_series(data, 'hrs')
@@ -247,7 +309,7 @@ def register_api_routes(app):
                 # 2. Try aggregated minutes if hrs failed
                 if not series:
                     logger.debug("TODAY (logic copied from DAY) 'hrs' failed, trying aggregation...")
-                    has_realpower_data = data and hasattr(data[0], 'ups_realpower') and any(d.ups_realpower is not None for d in data)
+                    has_realpower_data = _has_column_data(data, 'ups_realpower')
                     if has_realpower_data:
                          # Assuming aggregate_minute_data_to_hourly_series exists and works as intended
                          try:
@@ -267,7 +329,7 @@ def register_api_routes(app):
                 # 3. Try calculated if both failed
                 if not series:
                     logger.debug("TODAY (logic copied from DAY) aggregation failed, trying 'calculated'...")
-                    has_calc_data = data and hasattr(data[0], 'ups_load') and hasattr(data[0], 'ups_realpower_nominal') and any(d.ups_load is not None and d.ups_realpower_nominal is not None for d in data)
+                    has_calc_data = _has_column_data(data, 'ups_load', 'ups_realpower_nominal')
                     if has_calc_data:
                         series = format_cost_series(data, 'calculated')
                         if series: logger.debug(f"TODAY (logic copied from DAY) 'calculated' succeeded ({len(series)} points)")
@@ -286,7 +348,7 @@ def register_api_routes(app):
                 
                 try:
                     # Parse the date in the local timezone
-                    date_local = datetime.strptime(from_time, '%Y-%m-%d').date()
+                    date_local = _parse_date(from_time)
                     
                     # Create start and end datetime objects in the local timezone
                     start_time_local = tz.localize(datetime.combine(date_local, time.min))  # Start of day (00:00:00)
@@ -307,7 +369,7 @@ def register_api_routes(app):
                     logger.debug(f"  End time (UTC): {end_time.isoformat()}")
                 except ValueError as e:
                     logger.error(f"Invalid date format: {str(e)}")
-                    return jsonify({
+                    return _json({
                         'success': False,
                         'error': f"Invalid date format: {str(e)}"
                     })
@@ -324,7 +386,7 @@ def register_api_routes(app):
                 # --- Start Strict Priority Logic (similar to today) ---
                 series = []
                 # 1. Try hrs
-                has_hrs_data = data and hasattr(data[0], 'ups_realpower_hrs') and any(d.ups_realpower_hrs is not None for d in data)
+                has_hrs_data = _has_column_data(data, 'ups_realpower_hrs')
                 if has_hrs_data:
                     logger.debug("DAY trying 'hrs' data...")
                     series = format_cost_series(data, 'hrs')
@@ -332,7 +394,7 @@ def register_api_routes(app):
                 # 2. Try aggregated minutes if hrs failed
                 if not series:
                     logger.debug("DAY 'hrs' failed, trying aggregation...")
-                    has_realpower_data = data and hasattr(data[0], 'ups_realpower') and any(d.ups_realpower is not None for d in data)
+                    has_realpower_data = _has_column_data(data, 'ups_realpower')
                     if has_realpower_data:
                          series = aggregate_minute_data_to_hourly_series(data)
                          if series: logger.debug(f"DAY aggregation succeeded ({len(series)} points)")
@@ -342,7 +404,7 @@ def register_api_routes(app):
                 # 3. Try calculated if both failed
                 if not series:
                     logger.debug("DAY aggregation failed, trying 'calculated'...")
-                    has_calc_data = data and hasattr(data[0], 'ups_load') and hasattr(data[0], 'ups_realpower_nominal') and any(d.ups_load is not None and d.ups_realpower_nominal is not None for d in data)
+                    has_calc_data = _has_column_data(data, 'ups_load', 'ups_realpower_nominal')
                     if has_calc_data:
                         series = format_cost_series(data, 'calculated')
                         if series: logger.debug(f"DAY 'calculated' succeeded ({len(series)} points)")
@@ -361,14 +423,14 @@ def register_api_routes(app):
                 logger.debug(f"First point: timestamp={datetime.fromtimestamp(series[0]['x']/1000, tz=timezone.utc).isoformat()}, value={series[0]['y']}")
                 logger.debug(f"Last point: timestamp={datetime.fromtimestamp(series[-1]['x']/1000, tz=timezone.utc).isoformat()}, value={series[-1]['y']}")
 
-            return jsonify({
+            return _json({
                 'success': True,
                 'series': series
             })
             
         except Exception as e:
             logger.error(f"Error getting cost trend data: {str(e)}")
-            return jsonify({
+            return _json({
                 'success': False,
                 'error': str(e)
             })
@@ -376,7 +438,12 @@ def register_api_routes(app):
     @app.route('/api/energy/available-years')
     def get_available_years():
         """Return the years for which data is available, limited to the last 5"""
+        global _available_years_cache
         try:
+            cached_at, cached_years = _available_years_cache
+            if cached_years is not None and time_module.monotonic() - cached_at < AVAILABLE_YEARS_TTL:
+                return jsonify(cached_years)
+            
             UPSDynamicData = get_ups_model()
             with data_lock:
                 years = UPSDynamicData.query\
@@ -385,8 +452,12 @@ def register_api_routes(app):
                     .order_by(func.extract('year', UPSDynamicData.timestamp_utc).desc())\
                     .limit(5)\
                     .all()
-                
-            return jsonify([int(year[0]) for year in years])
+            
+            available_years = [int(year[0]) for year in years if year[0] is not None]
+            # An empty list is not cached, so years show up as soon as data arrives
+            if available_years:
+                _available_years_cache = (time_module.monotonic(), available_years)
+            return jsonify(available_years)
         except Exception as e:
             logger.error(f"Error getting available years: {str(e)}")
             return jsonify([])
@@ -402,7 +473,7 @@ def register_api_routes(app):
             
             if not from_time or not to_time or not detail_type:
                 logger.error(f"Missing required parameters: from_time={from_time}, to_time={to_time}, detail_type={detail_type}")
-                return jsonify({
+                return _json({
                     'success': False,
                     'error': 'Missing required parameters'
                 })
@@ -430,16 +501,18 @@ def register_api_routes(app):
                 start_time_utc = datetime.fromisoformat(from_time_utc_str)
                 end_time_utc = datetime.fromisoformat(to_time_utc_str)
 
-                # Ensure they are indeed UTC, might not be needed if fromisoformat handles +00:00 correctly
-                start_time_utc = start_time_utc.astimezone(pytz.utc)
-                end_time_utc = end_time_utc.astimezone(pytz.utc)
+                # Only normalize when the client sent a non-UTC offset
+                if start_time_utc.utcoffset():
+                    start_time_utc = start_time_utc.astimezone(pytz.utc)
+                if end_time_utc.utcoffset():
+                    end_time_utc = end_time_utc.astimezone(pytz.utc)
                 
                 # Log the UTC range used for query
                 logger.debug(f"Querying DB with UTC range: {start_time_utc.isoformat()} to {end_time_utc.isoformat()}")
 
             except Exception as e:
                 logger.error(f"Error parsing time format or converting to UTC: {str(e)}")
-                return jsonify({
+                return _json({
                     'success': False,
                     'error': f"Invalid time format: {str(e)}"
                 })
@@ -448,17 +521,12 @@ def register_api_routes(app):
             
             if detail_type == 'day':
                 # For the DateRange modal: show the 24 hours of the day
-                data = UPSDynamicData.query\
-                    .filter(
-                        UPSDynamicData.timestamp_utc >= start_time_utc, # Use UTC time
-                        UPSDynamicData.timestamp_utc <= end_time_utc  # Use UTC time
-                    )\
-                    .order_by(UPSDynamicData.timestamp_utc.asc()).all()
+                data = _query_cost_series_rows(UPSDynamicData, start_time_utc, end_time_utc)
                     
                 logger.debug(f"Found {len(data)} records for day detail between {start_time_utc} and {end_time_utc}") # Log UTC
                     
                 # Check if we have ups_realpower_hrs data
-                has_hrs_data = data and len(data) > 0 and hasattr(data[0], 'ups_realpower_hrs') and any(d.ups_realpower_hrs is not None for d in data)
+                has_hrs_data = _has_column_data(data, 'ups_realpower_hrs')
                 
                 if has_hrs_data:
                     logger.debug("Using ups_realpower_hrs for day detail")
@@ -470,12 +538,7 @@ def register_api_routes(app):
                 
             elif detail_type == 'hour':
                 # For the hour modal: show the 60 minutes
-                data = UPSDynamicData.query\
-                    .filter(
-                        UPSDynamicData.timestamp_utc >= start_time_utc, # Use UTC time
-                        UPSDynamicData.timestamp_utc <= end_time_utc  # Use UTC time
-                    )\
-                    .order_by(UPSDynamicData.timestamp_utc.asc()).all()
+                data = _query_cost_series_rows(UPSDynamicData, start_time_utc, end_time_utc)
                     
                 logger.debug(f"Found {len(data)} records for hour detail between {start_time_utc} and {end_time_utc}") # Log UTC
                     
@@ -489,7 +552,7 @@ def register_api_routes(app):
                 if not series:
                     logger.debug("Hour Detail 'realtime' failed, trying 'calculated'...")
                     # Check if data for calculated exists before calling
-                    has_calc_data = data and hasattr(data[0], 'ups_load') and hasattr(data[0], 'ups_realpower_nominal') and any(d.ups_load is not None and d.ups_realpower_nominal is not None for d in data)
+                    has_calc_data = _has_column_data(data, 'ups_load', 'ups_realpower_nominal')
                     if has_calc_data:
                         series = format_cost_series(data, 'calculated')
                         if series: logger.debug(f"Hour Detail 'calculated' succeeded ({len(series)} points)")
@@ -508,17 +571,12 @@ def register_api_routes(app):
             elif detail_type == 'minute':
                 # For the minute modal: show the 60 minutes (Note: Typo in original comment, should query minutes?)
                 # Assuming the query should still fetch data based on the provided UTC range for the hour
-                data = UPSDynamicData.query\
-                    .filter(
-                        UPSDynamicData.timestamp_utc >= start_time_utc, # Use UTC time
-                        UPSDynamicData.timestamp_utc <= end_time_utc  # Use UTC time
-                    )\
-                    .order_by(UPSDynamicData.timestamp_utc.asc()).all()
+                data = _query_cost_series_rows(UPSDynamicData, start_time_utc, end_time_utc)
                     
                 logger.debug(f"Found {len(data)} records for minute detail between {start_time_utc} and {end_time_utc}") # Log UTC
                     
                 # Check if we have ups_realpower data
-                has_realpower_data = data and len(data) > 0 and hasattr(data[0], 'ups_realpower') and any(d.ups_realpower is not None for d in data)
+                has_realpower_data = _has_column_data(data, 'ups_realpower')
                 
                 if has_realpower_data:
                     logger.debug("Using ups_realpower for minute detail")
@@ -534,21 +592,21 @@ def register_api_routes(app):
             
             else:
                 logger.error(f"Invalid detail type: {detail_type}")
-                return jsonify({
+                return _json({
                     'success': False,
                     'error': f"Invalid detail type: {detail_type}"
                 })
 
             logger.debug(f"Returning series with {len(series)} actual data points")
             
-            return jsonify({
+            return _json({
                 'success': True,
                 'series': series
             })
             
         except Exception as e:
             logger.error(f"Error getting detailed energy data: {str(e)}", exc_info=True)
-            return jsonify({
+            return _json({
                 'success': False,
                 'error': str(e)
             })
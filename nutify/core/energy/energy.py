@@ -5,6 +5,8 @@ from ..db.ups import (
     VariableConfig, data_lock, ups_data_cache
 )
 import calendar
+import logging
+import numpy as np
 from sqlalchemy import func
 import pytz
 from .. import settings
@@ -961,6 +963,52 @@ def format_trend_data(data, period_type):
         
     return series
 
+def _vectorized_cost_series(data, column, factor, decimals=4):
+    """
+    Build cost points for a per-row power column with NumPy.
+    
+    Args:
+        data: Rows with timestamp_utc (naive UTC) and the given column
+        column: Power column to convert into cost
+        factor: Multiplier turning the column value into a cost
+        decimals: Rounding applied to the cost
+        
+    Returns:
+        list: Points as {'x': epoch milliseconds, 'y': cost}
+    """
+    timestamps = []
+    values = []
+    for row in data:
+        value = getattr(row, column, None)
+        timestamp = row.timestamp_utc
+        if value is None or timestamp is None:
+            continue
+        timestamps.append(timestamp.replace(tzinfo=None))
+        values.append(value)
+    
+    if not values:
+        return []
+    
+    # Epoch milliseconds do not depend on the display timezone
+    x = np.array(timestamps, dtype='datetime64[ms]').astype(np.int64).astype(np.float64)
+    y = np.round(np.asarray(values, dtype=np.float64) * factor, decimals)
+    series = [{'x': x_ms, 'y': cost} for x_ms, cost in zip(x.tolist(), y.tolist())]
+    
+    # Per-point timezone details are only needed when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        local_tz = current_app.CACHE_TIMEZONE
+        for point, timestamp in zip(series, timestamps):
+            timestamp_utc_aware = timestamp.replace(tzinfo=pytz.utc)
+            timestamp_local = timestamp_utc_aware.astimezone(local_tz)
+            point['debug'] = {
+                'utc': timestamp_utc_aware.isoformat(),
+                'local': timestamp_local.isoformat(),
+                'hour_utc': timestamp_utc_aware.hour,
+                'hour_local': timestamp_local.hour
+            }
+    
+    return series
+
 def format_cost_series(data, energy_type='realtime'):
     """Format energy data for the cost chart"""
     rate = get_energy_rate()
@@ -972,69 +1020,18 @@ def format_cost_series(data, energy_type='realtime'):
 
         # Batch process all rows for each type
         if energy_type == 'realtime':
-            for row in data:
-                # Use ups_realpower directly (already in W)
-                if hasattr(row, 'ups_realpower') and row.ups_realpower is not None:
-                    energy = float(row.ups_realpower) / 1000  # Convert W to kW
-                    cost = energy * rate  # Cost per hour at this power
-                    # Divide by 60 to get cost per minute
-                    cost_per_minute = cost / 60
-                    
-                    # Get UTC timestamp (potentially naive)
-                    timestamp_utc_naive = row.timestamp_utc
-                    if timestamp_utc_naive is None: continue
-
-                    # Force UTC timezone info and then convert to local
-                    timestamp_utc_aware = timestamp_utc_naive.replace(tzinfo=pytz.utc)
-                    timestamp_local = timestamp_utc_aware.astimezone(current_app.CACHE_TIMEZONE)
-                    
-                    # Log both timestamps for debugging
-                    logger.debug(f"Data point: UTC={timestamp_utc_aware.isoformat()} (Hour: {timestamp_utc_aware.hour}), Local={timestamp_local.isoformat()} (Hour: {timestamp_local.hour})")
-                    
-                    series.append({
-                        'x': timestamp_local.timestamp() * 1000,  # Convert LOCAL timestamp to milliseconds
-                        'y': round(cost_per_minute, 4),
-                        # Add debug info
-                        'debug': {
-                            'utc': timestamp_utc_aware.isoformat(),
-                            'local': timestamp_local.isoformat(),
-                            'hour_utc': timestamp_utc_aware.hour,
-                            'hour_local': timestamp_local.hour
-                        }
-                    })
+            # ups_realpower is in W: convert to kW, cost per hour, then per minute
+            series = _vectorized_cost_series(data, 'ups_realpower', rate / 1000 / 60)
         elif energy_type == 'hrs':
-            for row in data:
-                if hasattr(row, 'ups_realpower_hrs') and row.ups_realpower_hrs is not None:
-                    energy_kwh = float(row.ups_realpower_hrs) / 1000  # Convert Wh to kWh
-                    cost = energy_kwh * rate
-                    
-                    # Get UTC timestamp (potentially naive)
-                    timestamp_utc_naive = row.timestamp_utc
-                    if timestamp_utc_naive is None: continue
-
-                    # Force UTC timezone info and then convert to local
-                    timestamp_utc_aware = timestamp_utc_naive.replace(tzinfo=pytz.utc)
-                    timestamp_local = timestamp_utc_aware.astimezone(current_app.CACHE_TIMEZONE)
-                    
-                    # Log both timestamps for debugging
-                    logger.debug(f"Data point (hrs): UTC={timestamp_utc_aware.isoformat()}, Local={timestamp_local.isoformat()}")
-                    
-                    series.append({
-                        'x': timestamp_local.timestamp() * 1000,  # Convert LOCAL timestamp to milliseconds
-                        'y': round(cost, 4),
-                        # Add debug info
-                        'debug': {
-                            'utc': timestamp_utc_aware.isoformat(),
-                            'local': timestamp_local.isoformat(),
-                            'hour_utc': timestamp_utc_aware.hour,
-                            'hour_local': timestamp_local.hour
-                        }
-                    })
+            # ups_realpower_hrs is in Wh: convert to kWh
+            series = _vectorized_cost_series(data, 'ups_realpower_hrs', rate / 1000)
         elif energy_type == 'calculated':
             prev_timestamp_aware = None # Initialize before loop for calculated block
             prev_power = None
             added_count = 0
             skipped_count = 0
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            local_tz = current_app.CACHE_TIMEZONE if debug_enabled else None
             
             logger.debug("Format Cost Series: Trying 'calculated' method.")
             for i, row in enumerate(data):
@@ -1086,24 +1083,25 @@ def format_cost_series(data, energy_type='realtime'):
                             # Cost
                             cost = energy_kwh * rate
                             
-                            # Convert the *current* timestamp to local for the x-axis value
-                            timestamp_local = current_timestamp_aware.astimezone(current_app.CACHE_TIMEZONE)
-                            
-                            # Log both timestamps for debugging
-                            logger.debug(f"Data point (calc): UTC={current_timestamp_aware.isoformat()}, Local={timestamp_local.isoformat()}")
+                            # Add to series at the current timestamp; epoch milliseconds
+                            # are the same in every timezone, so no local conversion is needed
+                            point = {
+                                'x': current_timestamp_aware.timestamp() * 1000,
+                                'y': round(cost, 6) # Use more precision for minutes
+                            }
                             
-                            # Add to series at the current timestamp
-                            series.append({
-                                'x': timestamp_local.timestamp() * 1000,  # Convert LOCAL timestamp to milliseconds
-                                'y': round(cost, 6), # Use more precision for minutes
-                                # Add debug info
-                                'debug': {
+                            # Per-point timezone details are only needed when debugging
+                            if debug_enabled:
+                                timestamp_local = current_timestamp_aware.astimezone(local_tz)
+                                logger.debug(f"Data point (calc): UTC={current_timestamp_aware.isoformat()}, Local={timestamp_local.isoformat()}")
+                                point['debug'] = {
                                     'utc': current_timestamp_aware.isoformat(),
                                     'local': timestamp_local.isoformat(),
                                     'hour_utc': current_timestamp_aware.hour,
                                     'hour_local': timestamp_local.hour
                                 }
-                            })
+                            
+                            series.append(point)
                             added_count += 1
                     else:
                          # First point in a sequence, cannot calculate interval yet
@@ -1276,6 +1274,110 @@ def calculate_cost_distribution(data, rate):
             'night': 0
         }
 
+# Ranges longer than this many days are aggregated by a thread pool
+RANGE_PARALLEL_MIN_DAYS = 7
+RANGE_MAX_WORKERS = 8
+
+def _calculate_day_energy_kwh(records):
+    """Time-weighted energy (kWh) of one day of load/nominal power records"""
+    # Sort by timestamp to ensure proper sequential processing
+    records.sort(key=lambda x: x.timestamp_utc)
+    
+    # Initialize day's energy
+    day_energy_kwh = 0
+    
+    # Use time-weighted approach for multiple records in a day
+    if len(records) > 1:
+        prev_timestamp_aware = None
+        prev_power = None
+        
+        for row in records:
+            current_timestamp_naive = row.timestamp_utc
+            if current_timestamp_naive is None: continue # Skip if timestamp is missing
+
+            # Make current timestamp UTC-aware
+            current_timestamp_aware = current_timestamp_naive.replace(tzinfo=pytz.utc)
+
+            current_power = (float(row.ups_realpower_nominal) * float(row.ups_load)) / 100  # W
+
+            if prev_timestamp_aware is not None and prev_power is not None:
+                # Calculate duration in hours
+                duration = (current_timestamp_aware - prev_timestamp_aware).total_seconds() / 3600
+                
+                # Skip if time difference is too large or non-positive
+                if duration <= 0 or duration > 2:
+                    # Still update prev values even if skipping interval calculation
+                    prev_timestamp_aware = current_timestamp_aware
+                    prev_power = current_power
+                    continue
+                    
+                # Calculate average power during this interval
+                avg_power = (current_power + prev_power) / 2  # W
+                
+                # Energy in kWh = power (W) * time (h) / 1000
+                interval_energy_kwh = (avg_power * duration) / 1000
+                day_energy_kwh += interval_energy_kwh
+            
+            # Update previous values
+            prev_timestamp_aware = current_timestamp_aware # Store aware timestamp
+            prev_power = current_power
+    else:
+        # For a single record in a day, estimate energy based on average load
+        row = records[0]
+        # Use 8 hours as a reasonable default duration if we only have one data point
+        power = (float(row.ups_realpower_nominal) * float(row.ups_load)) / 100  # W
+        day_energy_kwh = (power * 8) / 1000  # kWh
+    
+    return day_energy_kwh
+
+def _aggregate_range_chunk(UPSDynamicData, chunk_start, chunk_end, include_end):
+    """
+    Aggregate daily energy for one chunk of a date range.
+    
+    Chunks are aligned to UTC midnights so each day key is owned by one chunk.
+    
+    Returns:
+        tuple: (hrs_days, calculated_days) dicts mapping 'YYYY-MM-DD' to kWh
+    """
+    end_filter = UPSDynamicData.timestamp_utc <= chunk_end if include_end else UPSDynamicData.timestamp_utc < chunk_end
+    data = UPSDynamicData.query\
+        .filter(
+            UPSDynamicData.timestamp_utc >= chunk_start,
+            end_filter
+        ).order_by(UPSDynamicData.timestamp_utc.asc()).all()
+    
+    hrs_days = {}
+    day_records = {}
+    for row in data:
+        day_key = row.timestamp_utc.strftime('%Y-%m-%d')
+        
+        # Hourly energy data (Wh), converted to kWh for the cost calculation
+        hrs_value = getattr(row, 'ups_realpower_hrs', None)
+        if hrs_value is not None:
+            hrs_days[day_key] = hrs_days.get(day_key, 0) + float(hrs_value) / 1000
+        
+        # Load and nominal power records for the time-weighted fallback
+        if getattr(row, 'ups_load', None) is not None and getattr(row, 'ups_realpower_nominal', None) is not None:
+            day_records.setdefault(day_key, []).append(row)
+    
+    calculated_days = {
+        day_key: _calculate_day_energy_kwh(records)
+        for day_key, records in day_records.items()
+    }
+    return hrs_days, calculated_days
+
+def _split_range_by_utc_days(start_time, end_time, chunk_days):
+    """Split [start_time, end_time] into chunks whose inner boundaries are UTC midnights"""
+    chunks = []
+    chunk_start = start_time
+    while True:
+        boundary = (chunk_start + timedelta(days=chunk_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+        if boundary >= end_time:
+            chunks.append((chunk_start, end_time, True))
+            return chunks
+        chunks.append((chunk_start, boundary, False))
+        chunk_start = boundary
+
 def get_cost_trend_for_range(start_time, end_time):
     """Get cost trend data for a date range"""
     try:
@@ -1283,113 +1385,43 @@ def get_cost_trend_for_range(start_time, end_time):
         
         logger.debug(f"Getting cost trend for range: {start_time} to {end_time}")
         
-        # Get all data for the range without filtering on specific columns
-        data = UPSDynamicData.query\
-            .filter(
-                UPSDynamicData.timestamp_utc >= start_time,
-                UPSDynamicData.timestamp_utc <= end_time
-            ).order_by(UPSDynamicData.timestamp_utc.asc()).all()
-        
-        logger.debug(f"Found {len(data)} records for date range")
-        
         series = []
         rate = get_energy_rate()
         
-        # Initialize day_data dictionary to track daily energy values
-        day_data = {}
+        days = (end_time - start_time).days + 1
+        if days > RANGE_PARALLEL_MIN_DAYS:
+            # Long range: aggregate day-aligned chunks concurrently, each worker
+            # in its own app context (and therefore its own DB session)
+            from concurrent.futures import ThreadPoolExecutor
+            workers = min(RANGE_MAX_WORKERS, days)
+            chunk_days = max(1, days // (workers * 4))
+            chunks = _split_range_by_utc_days(start_time, end_time, chunk_days)
+            app = current_app._get_current_object()
+            
+            def run_chunk(chunk):
+                with app.app_context():
+                    return _aggregate_range_chunk(UPSDynamicData, *chunk)
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(run_chunk, chunks))
+            logger.debug(f"Aggregated {len(chunks)} chunks of {chunk_days} day(s) with {workers} workers")
+        else:
+            results = [_aggregate_range_chunk(UPSDynamicData, start_time, end_time, True)]
         
-        # First try to use ups_realpower_hrs data (hourly energy data)
-        has_hrs_data = data and len(data) > 0 and hasattr(data[0], 'ups_realpower_hrs') and any(d.ups_realpower_hrs is not None for d in data)
+        hrs_data = {}
+        calculated_data = {}
+        for hrs_days, calculated_days in results:
+            hrs_data.update(hrs_days)
+            calculated_data.update(calculated_days)
         
-        if has_hrs_data:
+        # First try to use ups_realpower_hrs data (hourly energy data),
+        # then fall back to calculating from load and nominal power
+        if hrs_data:
             logger.debug("Using ups_realpower_hrs data for range trend")
-            # Group by day and sum the energy
-            for row in data:
-                if not hasattr(row, 'ups_realpower_hrs') or row.ups_realpower_hrs is None:
-                    continue
-                    
-                day_key = row.timestamp_utc.strftime('%Y-%m-%d')
-                if day_key not in day_data:
-                    day_data[day_key] = 0
-                
-                # Convert Wh to kWh for the cost calculation
-                day_data[day_key] += float(row.ups_realpower_hrs) / 1000
+            day_data = hrs_data
         else:
-            # Fall back to calculating from load and nominal power
             logger.debug("No ups_realpower_hrs data found, using load and nominal power")
-            
-            # First try to group records by day to calculate daily energy
-            day_records = {}
-            
-            for row in data:
-                if not hasattr(row, 'ups_load') or not hasattr(row, 'ups_realpower_nominal'):
-                    continue
-                    
-                if row.ups_load is None or row.ups_realpower_nominal is None:
-                    continue
-                
-                day_key = row.timestamp_utc.strftime('%Y-%m-%d')
-                if day_key not in day_records:
-                    day_records[day_key] = []
-                
-                day_records[day_key].append(row)
-            
-            # Now calculate energy for each day using time-weighted approach
-            for day_key, records in day_records.items():
-                if len(records) == 0:
-                    continue
-                    
-                # Sort by timestamp to ensure proper sequential processing
-                records.sort(key=lambda x: x.timestamp_utc)
-                
-                # Initialize day's energy
-                day_energy_kwh = 0
-                
-                # Use time-weighted approach for multiple records in a day
-                if len(records) > 1:
-                    prev_timestamp_aware = None
-                    prev_power = None
-                    
-                    for row in records:
-                        current_timestamp_naive = row.timestamp_utc
-                        if current_timestamp_naive is None: continue # Skip if timestamp is missing
-
-                        # Make current timestamp UTC-aware
-                        current_timestamp_aware = current_timestamp_naive.replace(tzinfo=pytz.utc)
-
-                        # Calculate power here (this line was likely deleted)
-                        current_power = (float(row.ups_realpower_nominal) * float(row.ups_load)) / 100  # W
-
-                        if prev_timestamp_aware is not None and prev_power is not None:
-                            # Calculate duration in hours
-                            duration = (current_timestamp_aware - prev_timestamp_aware).total_seconds() / 3600
-                            
-                            # Skip if time difference is too large or non-positive
-                            if duration <= 0 or duration > 2:
-                                # Still update prev values even if skipping interval calculation
-                                prev_timestamp_aware = current_timestamp_aware
-                                prev_power = current_power
-                                continue
-                                
-                            # Calculate average power during this interval
-                            avg_power = (current_power + prev_power) / 2  # W
-                            
-                            # Energy in kWh = power (W) * time (h) / 1000
-                            interval_energy_kwh = (avg_power * duration) / 1000
-                            day_energy_kwh += interval_energy_kwh
-                        
-                        # Update previous values
-                        prev_timestamp_aware = current_timestamp_aware # Store aware timestamp
-                        prev_power = current_power
-                else:
-                    # For a single record in a day, estimate energy based on average load
-                    row = records[0]
-                    # Use 8 hours as a reasonable default duration if we only have one data point
-                    power = (float(row.ups_realpower_nominal) * float(row.ups_load)) / 100  # W
-                    day_energy_kwh = (power * 8) / 1000  # kWh
-                
-                # Store the day's energy
-                day_data[day_key] = day_energy_kwh
+            day_data = calculated_data
         
         # Create a complete series with all days in the range, including those with zero energy
         current_date = start_time.date()
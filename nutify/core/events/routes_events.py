@@ -2,30 +2,135 @@
 Routes for UPS events handling and display.
 """
 
-from flask import Blueprint, render_template, jsonify, request, current_app
+import queue
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+import orjson
+from flask import Blueprint, Response, render_template, request, current_app
 from core.db.ups import get_ups_data
 from core.logger import events_logger as logger
 from core.auth import require_permission
-from core.upsmon import handle_nut_event, get_event_history, get_events_table
+from core.upsmon import handle_nut_events, get_event_history, get_events_table
 
 # Create a blueprint for events routes
 routes_events = Blueprint('routes_events', __name__)
 
+# Seconds the UPS data rendered into the events page is reused
+EVENTS_PAGE_DATA_TTL = 5
+
+# Compiled events page template, resolved once when the blueprint is registered
+_events_tmpl = None
+
+@routes_events.record_once
+def _load_events_template(state):
+    """Resolve dashboard/events.html through the app's Jinja loader once"""
+    global _events_tmpl
+    _events_tmpl = state.app.jinja_env.get_template('dashboard/events.html')
+
+# Largest accepted /nut_event body; real events are a few hundred bytes
+MAX_NUT_EVENT_BYTES = 64 * 1024
+
+# JSON encoder bound once at import
+_dumps = orjson.dumps
+
+def _json_body(body, status=200):
+    """Response for an already serialized JSON body"""
+    return Response(body, status=status, mimetype='application/json')
+
+def _json(obj, status=200):
+    """JSON response without going through jsonify and the app's JSON provider"""
+    return _json_body(_dumps(obj), status)
+
+# Pre-serialized bodies of the fixed /nut_event responses
+_QUEUED_BODY = _dumps({"status": "queued"})
+_BAD_JSON_BODY = _dumps({"status": "error", "message": "Invalid JSON body"})
+_NOT_OBJECT_BODY = _dumps({"status": "error", "message": "JSON body must be an object"})
+_TOO_LARGE_BODY = _dumps({"status": "error", "message": "payload too large"})
+_QUEUE_FULL_BODY = _dumps({"status": "error", "message": "Event queue is full"})
+
+# NUT events accepted by /nut_event and waiting to be processed
+NUT_EVENT_QUEUE_SIZE = 1000
+# Maximum number of queued events stored in one database transaction
+NUT_EVENT_BATCH_SIZE = 64
+_event_q = queue.Queue(maxsize=NUT_EVENT_QUEUE_SIZE)
+
+def _nut_event_worker(app):
+    """Process queued NUT events outside the request thread, in batches"""
+    while True:
+        batch = [_event_q.get()]
+        try:
+            while len(batch) < NUT_EVENT_BATCH_SIZE:
+                batch.append(_event_q.get_nowait())
+        except queue.Empty:
+            pass
+        
+        # Queue items are (event, time it was received)
+        events, received_at = zip(*batch)
+        try:
+            with app.app_context():
+                handle_nut_events(app, list(events), list(received_at))
+        except Exception as e:
+            logger.error(f"Error handling queued NUT events: {str(e)}", exc_info=True)
+
+@routes_events.record_once
+def _start_nut_event_worker(state):
+    """Start the background NUT event worker for the registering app"""
+    worker = threading.Thread(
+        target=_nut_event_worker,
+        args=(state.app,),
+        name='nut-event-worker',
+        daemon=True
+    )
+    worker.start()
+    logger.debug("🧵 NUT event worker started")
+
+@lru_cache(maxsize=1)
+def _ups_snapshot(epoch_bucket):
+    """UPS data for the events page; the bucket argument rotates the cache every TTL"""
+    return get_ups_data()
+
 @routes_events.route('/events')
 @require_permission('events')
 def events_page():
     """Render the events page"""
-    data = get_ups_data()  # This takes the static UPS data
-    return render_template('dashboard/events.html', 
-                         data=data,
-                         timezone=current_app.CACHE_TIMEZONE)
+    data = _ups_snapshot(int(time.time() // EVENTS_PAGE_DATA_TTL))  # This takes the static UPS data
+    if _events_tmpl is None:
+        return render_template('dashboard/events.html', 
+                             data=data,
+                             timezone=current_app.CACHE_TIMEZONE)
+    
+    # Render the cached template with the same context render_template would provide
+    context = {'data': data, 'timezone': current_app.CACHE_TIMEZONE}
+    current_app.update_template_context(context)
+    return Response(_events_tmpl.render(context), mimetype='text/html')
 
 @routes_events.route('/nut_event', methods=['POST'])
 def nut_event_route():
     """Handles incoming NUT events"""
+    # Reject missing or oversized bodies before reading or parsing them
+    content_length = request.content_length
+    if content_length is None or content_length > MAX_NUT_EVENT_BYTES:
+        return _json_body(_TOO_LARGE_BODY, 413)
+    
+    # Trusted internal endpoint: parse the raw stream, skipping get_json's content-type handling
+    try:
+        data = orjson.loads(request.stream.read())
+    except orjson.JSONDecodeError:
+        return _json_body(_BAD_JSON_BODY, 400)
+    # Anything but an object would fail in the worker and take its whole batch down
+    if not isinstance(data, dict):
+        return _json_body(_NOT_OBJECT_BODY, 400)
+    
     try:
-        data = request.get_json()
-        return handle_nut_event(current_app, data)
+        # Hand the event to the background worker and acknowledge right away
+        # Stamp the arrival time here: the worker may only store the event later
+        _event_q.put_nowait((data, datetime.now(current_app.CACHE_TIMEZONE)))
+        return _json_body(_QUEUED_BODY, 202)
+    except queue.Full:
+        logger.warning("NUT event queue is full, rejecting event")
+        return _json_body(_QUEUE_FULL_BODY, 503)
     except Exception as e:
         logger.error(f"Error handling NUT event: {str(e)}", exc_info=True)
-        return jsonify({"status": "error", "message": str(e)}), 500 
\ No newline at end of file
+        return _json({"status": "error", "message": str(e)}, 500) 
\ No newline at end of file
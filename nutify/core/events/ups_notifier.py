@@ -30,16 +30,21 @@ except ImportError:
 import os
 import sys
 import re
+import json
+import fcntl
+import functools
+import importlib.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 import logging
 import datetime
 import traceback
 from pathlib import Path
-import platform
-import pytz
+from types import MappingProxyType
 import sqlite3
 import jinja2
-from sqlalchemy import text, inspect
-import json
+from sqlalchemy import func, inspect, select
 
 # Add the application directory to sys.path to allow imports
 APP_DIR = str(Path(__file__).resolve().parent.parent.parent)
@@ -86,6 +91,12 @@ else:
 # Database path
 DB_PATH = os.path.join(APP_DIR, "instance", "nutify.db.sqlite")
 
+# Circuit breaker state, kept between notifier runs (one process per event)
+CIRCUIT_STATE_FILE = os.path.join(APP_DIR, "instance", "notifier_circuits.json")
+
+# When each (UPS, event) pair was last notified, shared between notifier runs
+RECENT_EVENTS_FILE = os.path.join(APP_DIR, "instance", "notifier_recent.json")
+
 # Import app modules after logging is set up
 try:
     # Import the main app module to get CACHE_TIMEZONE
@@ -95,29 +106,18 @@ try:
     from core import create_app
     from core.mail.mail import EmailNotifier
     from core.db.ups import db, UPSEvent
-    from core.logger import mail_logger as logger, database_logger
+    from core.logger import mail_logger as logger
 
-    # Import ntfy notification system
-    try:
-        from core.extranotifs.ntfy import NtfyNotifier
-        from core.extranotifs.ntfy.db import get_ntfy_model, get_default_config
-        HAS_NTFY = True
-    except ImportError:
+    # Ntfy and webhook modules are only imported when an event has them enabled
+    HAS_NTFY = importlib.util.find_spec("core.extranotifs.ntfy") is not None
+    if not HAS_NTFY:
         logger.warning("Ntfy notification module not available")
-        HAS_NTFY = False
 
-    # Import webhook notification system
-    try:
-        from core.extranotifs.webhook import WebhookNotifier
-        from core.extranotifs.webhook.webhook import send_event_notification as send_webhook_notification
-        HAS_WEBHOOK = True
-    except ImportError:
+    HAS_WEBHOOK = importlib.util.find_spec("core.extranotifs.webhook") is not None
+    if not HAS_WEBHOOK:
         logger.warning("Webhook notification module not available")
-        HAS_WEBHOOK = False
 
     from core.db.ups.models import get_ups_model, get_static_model
-    from core.db.orm.orm_ups_events import init_model as init_event_model
-    from core.db.orm.orm_ups_opt_notification import init_model as init_notification_model
     from core.db.ups.utils import ups_config
     from core.db.model_classes import init_model_classes, register_models_for_global_access
     from core.mail import get_mail_config_model, get_notification_settings_model
@@ -132,6 +132,9 @@ try:
     # Set global CACHE_TIMEZONE from app module
     app.CACHE_TIMEZONE = CACHE_TIMEZONE
     logger.info(f"Set app.CACHE_TIMEZONE from global module: {CACHE_TIMEZONE.zone}")
+    
+    # The notifier handles a single event per process: resolve the display timezone once
+    LOCAL_TZ = app.CACHE_TIMEZONE
 
     # Initialize the report manager with the custom timezone to prevent errors
     from core.report.report import report_manager
@@ -142,42 +145,72 @@ try:
 
     # Set template path for this script
     app.template_folder = os.path.join(APP_DIR, 'templates')
+    
+    # Every upsmon event runs this script in a fresh process, so Flask's in-memory
+    # template cache never survives between notifications. Keep the compiled
+    # template bytecode on disk and skip the per-render mtime checks.
+    app.jinja_env.auto_reload = False
+    app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache()
 except Exception as e:
     logger.critical(f"Failed to initialize application modules: {str(e)}")
     logger.critical(traceback.format_exc())
     sys.exit(1)
 
-def log_message(message, is_debug=False):
-    """Log a message to both log files"""
+class NotifierFileFormatter(logging.Formatter):
+    """Format notifier.log lines as "[timestamp] message" in the app CACHE_TIMEZONE"""
+    
+    def formatTime(self, record, datefmt=None):
+        return datetime.datetime.fromtimestamp(record.created, LOCAL_TZ).strftime(datefmt)
+
+# `logger` now points at mail_logger, so notifier.log gets its own logger that
+# reuses the already-open LOG_FILE handler instead of reopening the file per message
+file_handler.setFormatter(NotifierFileFormatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+notifier_file_logger = logging.getLogger("ups_notifier.file")
+notifier_file_logger.setLevel(logging.DEBUG)
+notifier_file_logger.propagate = False
+notifier_file_logger.addHandler(file_handler)
+
+# The log level is fixed for the life of the notifier process, check it once
+_DEBUG = logger.isEnabledFor(logging.DEBUG)
+
+def log_message(message, *args, is_debug=False):
+    """
+    Log a message to both log files
+    
+    Args:
+        message: Message, optionally with %-style placeholders
+        *args: Values for the placeholders, only formatted if the message is emitted
+        is_debug: Log at DEBUG level; skipped entirely when DEBUG is disabled
+    """
     if is_debug:
-        logger.debug(message)
+        if not _DEBUG:
+            return
+        logger.debug(message, *args)
     else:
-        logger.info(message)
+        logger.info(message, *args)
     
     # Ensure it's written to disk immediately
     for handler in logger.handlers:
         handler.flush()
     
-    # Also write to a separate dedicated notifier log file for better debugging
-    try:
-        with open("/var/log/nut/notifier.log", "a") as f:
-            # Use timezone from cache for timestamp
-            timestamp = datetime.datetime.now(app.CACHE_TIMEZONE).strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{timestamp}] {message}\n")
-            f.flush()
-    except Exception as e:
-        # Don't fail if we can't write to this file
-        pass
+    # Also write to the dedicated notifier log file for better debugging
+    # (FileHandler flushes after every record)
+    notifier_file_logger.info(message, *args)
+
+def log_traceback():
+    """Log the current exception's traceback at DEBUG level, walking the stack only if DEBUG is on"""
+    if _DEBUG:
+        log_message("TRACEBACK: %s", traceback.format_exc(), is_debug=True)
 
 # Initialize models in app context
 with app.app_context():
     # Check if models are already initialized to prevent duplicate registrations
     if hasattr(db, 'ModelClasses'):
-        log_message("📚 Models already initialized, using existing models", True)
+        log_message("📚 Models already initialized, using existing models", is_debug=True)
         model_classes = db.ModelClasses
     else:
         # Initialize model classes only if they haven't been initialized yet
-        log_message("📚 Initializing models for the first time", True)
+        log_message("📚 Initializing models for the first time", is_debug=True)
         model_classes = init_model_classes(db, lambda: app.CACHE_TIMEZONE)
         db.ModelClasses = model_classes
         
@@ -192,6 +225,9 @@ with app.app_context():
     # Get mail models
     MailConfigModel = model_classes.MailConfig
     
+    # Table names only change on schema migrations, which never happen mid-run
+    _TABLES = frozenset(inspect(db.engine).get_table_names())
+    
     # Initialize UPS configuration if needed
     if not ups_config.is_initialized():
         # Load from configuration files
@@ -206,6 +242,33 @@ with app.app_context():
             )
             log_message(f"UPS configuration loaded from configuration files: {params['host']}:{params['name']}")
 
+# Free-form messages upsmon can pass as a single argument, compiled once at import.
+# Order matters: the first matching pattern wins.
+_MESSAGE_EVENT_PATTERNS = (
+    (re.compile(r"Communications with UPS ([^\s]+) lost"), "COMMBAD"),
+    (re.compile(r"Communications restored with UPS ([^\s]+)"), "COMMOK"),
+    (re.compile(r"No communication with UPS ([^\s]+)"), "NOCOMM"),
+    (re.compile(r"Parent process died.*UPS ([^\s]+)"), "NOPARENT"),
+    (re.compile(r"System was shutdown by UPS ([^\s]+)"), "SHUTDOWN"),
+)
+
+# Status phrases found in "UPS <name> <status>" messages, checked in order
+# against the lower-cased message
+_STATUS_KEYWORDS = (
+    ("on battery", "ONBATT"),
+    ("on line power", "ONLINE"),
+    ("online", "ONLINE"),
+    ("low battery", "LOWBATT"),
+    ("forced shutdown", "FSD"),
+    ("communication restored", "COMMOK"),
+    ("communication lost", "COMMBAD"),
+    ("shutdown in progress", "SHUTDOWN"),
+    ("battery needs replacing", "REPLBATT"),
+    ("needs battery replacement", "REPLBATT"),
+    ("no communication", "NOCOMM"),
+    ("parent process", "NOPARENT"),
+)
+
 def parse_input_args(args):
     """
     Parse the input arguments from upsmon.
@@ -216,7 +279,7 @@ def parse_input_args(args):
     Returns:
         tuple: (ups_name, event_type)
     """
-    log_message(f"DEBUG: Script started with args: {args}", True)
+    log_message("DEBUG: Script started with args: %s", args, is_debug=True)
     
     if len(args) < 1:
         log_message("ERROR: No arguments provided")
@@ -226,145 +289,50 @@ def parse_input_args(args):
     # We need to check these first to avoid incorrect matches with the standard format
     if len(args) == 1:
         message = args[0]
-        log_message(f"DEBUG: Processing single argument message: {message}", True)
-        
-        # === COMMUNICATION EVENTS ===
-        # Handle "Communications with UPS ups@host lost" format
-        if "Communications with UPS" in message and "lost" in message:
-            log_message(f"DEBUG: Detected communication lost format", True)
-            comm_lost_match = re.search(r"Communications with UPS ([^\s]+) lost", message)
-            if comm_lost_match:
-                ups_name = comm_lost_match.group(1)
-                event_type = "COMMBAD"
-                log_message(f"DEBUG: Detected COMMBAD event for {ups_name}", True)
-                return ups_name, event_type
-        
-        # Handle "Communications restored with UPS ups@host" format
-        if "Communications restored with UPS" in message:
-            log_message(f"DEBUG: Detected communication restored format", True)
-            comm_restored_match = re.search(r"Communications restored with UPS ([^\s]+)", message)
-            if comm_restored_match:
-                ups_name = comm_restored_match.group(1)
-                event_type = "COMMOK"
-                log_message(f"DEBUG: Detected COMMOK event for {ups_name}", True)
-                return ups_name, event_type
-        
-        # Handle "No communication with UPS ups@host" format
-        if "No communication with UPS" in message:
-            log_message(f"DEBUG: Detected no communication format", True)
-            nocomm_match = re.search(r"No communication with UPS ([^\s]+)", message)
-            if nocomm_match:
-                ups_name = nocomm_match.group(1)
-                event_type = "NOCOMM"
-                log_message(f"DEBUG: Detected NOCOMM event for {ups_name}", True)
-                return ups_name, event_type
-        
-        # Handle "Parent process died - shutting down UPS ups@host" format
-        if "Parent process died" in message:
-            log_message(f"DEBUG: Detected parent process died format", True)
-            noparent_match = re.search(r"Parent process died.*UPS ([^\s]+)", message)
-            if noparent_match:
-                ups_name = noparent_match.group(1)
-                event_type = "NOPARENT"
-                log_message(f"DEBUG: Detected NOPARENT event for {ups_name}", True)
-                return ups_name, event_type
-        
-        # === SHUTDOWN EVENTS ===
-        # Handle "System was shutdown by UPS ups@host" format
-        if "System was shutdown by UPS" in message:
-            log_message(f"DEBUG: Detected system shutdown format", True)
-            shutdown_match = re.search(r"System was shutdown by UPS ([^\s]+)", message)
-            if shutdown_match:
-                ups_name = shutdown_match.group(1)
-                event_type = "SHUTDOWN"
-                log_message(f"DEBUG: Detected SHUTDOWN event for {ups_name}", True)
+        log_message("DEBUG: Processing single argument message: %s", message, is_debug=True)
+        
+        # === COMMUNICATION AND SHUTDOWN EVENTS ===
+        # e.g. "Communications with UPS ups@host lost", "System was shutdown by UPS ups@host"
+        for pattern, event_type in _MESSAGE_EVENT_PATTERNS:
+            match = pattern.search(message)
+            if match:
+                ups_name = match.group(1)
+                log_message("DEBUG: Detected %s event for %s", event_type, ups_name, is_debug=True)
                 return ups_name, event_type
         
         # === UPS STATUS EVENTS ===
         # Format: "UPS ups@host on battery" etc.
         if message.startswith("UPS "):
-            ups_match = re.search(r"^UPS\s+([^\s]+)", message)
-            if ups_match:
-                ups_name = ups_match.group(1)
-                log_message(f"DEBUG: Extracted UPS name from message: {ups_name}", True)
-                
-                # Now look for specific event types
-                
-                # ONBATT: UPS on battery power
-                if "on battery" in message:
-                    event_type = "ONBATT"
-                    log_message(f"DEBUG: Detected ONBATT event for {ups_name}", True)
-                    return ups_name, event_type
-                
-                # ONLINE: UPS on line power
-                if "on line power" in message or "online" in message.lower():
-                    event_type = "ONLINE"
-                    log_message(f"DEBUG: Detected ONLINE event for {ups_name}", True)
-                    return ups_name, event_type
-                
-                # LOWBATT: UPS battery is low
-                if "low battery" in message:
-                    event_type = "LOWBATT"
-                    log_message(f"DEBUG: Detected LOWBATT event for {ups_name}", True)
-                    return ups_name, event_type
-                
-                # FSD: Forced shutdown in progress
-                if "forced shutdown" in message:
-                    event_type = "FSD"
-                    log_message(f"DEBUG: Detected FSD event for {ups_name}", True)
-                    return ups_name, event_type
-                
-                # COMMOK: Communication restored
-                if "communication restored" in message:
-                    event_type = "COMMOK"
-                    log_message(f"DEBUG: Detected COMMOK event for {ups_name}", True)
-                    return ups_name, event_type
+            parts = message.split(maxsplit=2)
+            if len(parts) > 1:
+                ups_name = parts[1]
+                log_message("DEBUG: Extracted UPS name from message: %s", ups_name, is_debug=True)
                 
-                # COMMBAD: Communication lost
-                if "communication lost" in message:
-                    event_type = "COMMBAD"
-                    log_message(f"DEBUG: Detected COMMBAD event for {ups_name}", True)
-                    return ups_name, event_type
-                
-                # SHUTDOWN: System shutdown in progress
-                if "shutdown in progress" in message:
-                    event_type = "SHUTDOWN"
-                    log_message(f"DEBUG: Detected SHUTDOWN event for {ups_name}", True)
-                    return ups_name, event_type
-                
-                # REPLBATT: Battery needs replacement
-                if "battery needs replacing" in message or "needs battery replacement" in message:
-                    event_type = "REPLBATT"
-                    log_message(f"DEBUG: Detected REPLBATT event for {ups_name}", True)
-                    return ups_name, event_type
-                
-                # NOCOMM: No communication with UPS
-                if "no communication" in message:
-                    event_type = "NOCOMM"
-                    log_message(f"DEBUG: Detected NOCOMM event for {ups_name}", True)
-                    return ups_name, event_type
-                
-                # NOPARENT: Parent process died
-                if "parent process" in message:
-                    event_type = "NOPARENT"
-                    log_message(f"DEBUG: Detected NOPARENT event for {ups_name}", True)
-                    return ups_name, event_type
+                # Now look for specific event types; the first keyword found wins.
+                # Only the text after the UPS name, so a name like "online-rack" can't match
+                lowered = parts[2].lower() if len(parts) > 2 else ""
+                for keyword, event_type in _STATUS_KEYWORDS:
+                    if keyword in lowered:
+                        log_message("DEBUG: Detected %s event for %s", event_type, ups_name, is_debug=True)
+                        return ups_name, event_type
     
         # Special case for standard format in a single argument (possibly from command shell)
         if " " in message and not message.startswith("UPS ") and not "Communications" in message and not "No communication" in message and not "Parent process" in message:
             parts = message.split(" ", 1)
             if len(parts) == 2:
                 ups_name = parts[0]
-                event_type = parts[1]
-                log_message(f"DEBUG: Detected standard split format: {ups_name} {event_type}", True)
+                # Intern so lookups in the per-event tables compare by identity
+                event_type = sys.intern(parts[1].upper())
+                log_message("DEBUG: Detected standard split format: %s %s", ups_name, event_type, is_debug=True)
                 return ups_name, event_type
     
     # === STANDARD FORMAT HANDLING ===
     # Standard direct format: ups@hostname EVENT_TYPE (the official NUT format)
     elif len(args) == 2:
         ups_name = args[0]
-        event_type = args[1]
-        log_message(f"DEBUG: Detected standard format: {ups_name} {event_type}", True)
+        # Intern so lookups in the per-event tables compare by identity
+        event_type = sys.intern(args[1].upper())
+        log_message("DEBUG: Detected standard format: %s %s", ups_name, event_type, is_debug=True)
         return ups_name, event_type
     
     # If we get here, format was not recognized
@@ -398,7 +366,7 @@ def get_enabled_notifications(event_type):
                 })
         
         if not result:
-            log_message(f"DEBUG: No enabled notifications found for {event_type}", True)
+            log_message("DEBUG: No enabled notifications found for %s", event_type, is_debug=True)
             return []
             
         return result
@@ -406,6 +374,184 @@ def get_enabled_notifications(event_type):
         log_message(f"ERROR: Failed to get enabled notifications: {str(e)}")
         return []
 
+def with_suffix(value, suffix, separator=''):
+    """
+    Append a unit suffix to a value unless it already ends with it
+    
+    Args:
+        value (str): Value to format
+        suffix (str): Unit suffix, e.g. 'V', '%' or 'min'
+        separator (str): Text placed between value and suffix when appended
+        
+    Returns:
+        str: Value ending with the suffix
+    """
+    return value if value.endswith(suffix) else f"{value}{separator}{suffix}"
+
+def minutes_from_seconds(value):
+    """
+    Format a seconds count as whole minutes
+    
+    Args:
+        value (str): Seconds as reported by NUT, may be None
+        
+    Returns:
+        str: "<minutes> min", or None if value is not a plain number
+    """
+    return f"{int(value) // 60} min" if value and value.isdigit() else None
+
+# Display units for notification values: (key, suffix, separator). Every key
+# containing 'voltage' additionally gets 'V'.
+_UNIT_SUFFIXES = (
+    ('battery_charge', '%', ''),
+    ('ups_load', '%', ''),
+    ('battery_duration', 'min', ' '),
+    ('comm_duration', 'min', ' ')
+)
+
+def normalize_ups_info(ups_info):
+    """
+    Add display units to UPS values in place and fill in runtime_estimate
+    
+    Args:
+        ups_info (dict): UPS information with string values
+    """
+    for key, suffix, separator in _UNIT_SUFFIXES:
+        value = ups_info.get(key)
+        if value:
+            ups_info[key] = with_suffix(value, suffix, separator)
+    
+    for key, value in ups_info.items():
+        if 'voltage' in key and value:
+            ups_info[key] = with_suffix(value, 'V')
+    
+    # battery_runtime is reported in seconds
+    runtime = minutes_from_seconds(ups_info.get('battery_runtime'))
+    if runtime:
+        ups_info['runtime_estimate'] = runtime
+    elif ups_info.get('runtime_estimate'):
+        ups_info['runtime_estimate'] = with_suffix(ups_info['runtime_estimate'], 'min', ' ')
+    
+    # Make sure we always have some value for runtime_estimate
+    if ups_info.get('runtime_estimate', '0 min') == '0 min':
+        runtime_low = minutes_from_seconds(ups_info.get('battery_runtime_low'))
+        charge = ups_info.get('battery_charge', '').rstrip('%')
+        if runtime_low:
+            ups_info['runtime_estimate'] = runtime_low
+        elif charge.isdigit():
+            # Simple estimation: 1% charge = 1 minute runtime (very rough approximation)
+            ups_info['runtime_estimate'] = f"{int(charge)} min"
+
+# Columns read from ups_static_data / ups_dynamic_data for notification templates
+_STATIC_INFO_FIELDS = ('device_model', 'device_serial', 'battery_type', 'ups_model')
+_DYNAMIC_INFO_FIELDS = (
+    'ups_status', 'battery_charge', 'battery_runtime', 'input_voltage',
+    'battery_voltage', 'battery_voltage_nominal', 'ups_timer_shutdown'
+)
+_DYNAMIC_INFO_SUFFIXES = {
+    'battery_charge': '%',
+    'input_voltage': 'V',
+    'battery_voltage': 'V',
+    'battery_voltage_nominal': 'V'
+}
+
+# Safe values used by get_ups_info when the database has nothing better
+_UPS_INFO_DEFAULTS = {
+    'ups_model': 'Unknown UPS',
+    'device_serial': 'Unknown',
+    'ups_status': 'Unknown',
+    'battery_charge': '0%',
+    'runtime_estimate': '0 min',
+    'input_voltage': '0V',
+    'battery_voltage': '0V',
+    'ups_host': 'Unknown',
+    'battery_voltage_nominal': '0V',
+    'battery_type': 'Unknown',
+    'ups_timer_shutdown': '0',
+    'comm_duration': '0 min',
+    'battery_duration': '0 min',
+    'battery_age': 'Unknown',
+    'battery_efficiency': '0%'
+}
+
+_readonly_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def get_readonly_connection():
+    """
+    Get a read-only sqlite3 connection for the UPS info lookups
+    
+    The notifier only reads ups_static_data / ups_dynamic_data, so these queries
+    skip SQLAlchemy's session, statement compilation and ORM machinery.
+    Event writes keep going through db.session.
+    
+    Returns:
+        sqlite3.Connection: Connection with sqlite3.Row rows
+    """
+    conn = sqlite3.connect(f"file:{db.engine.url.database}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+@functools.lru_cache(maxsize=None)
+def _latest_row_sql(model, fields, order_column=None):
+    """
+    Build the SELECT used by _read_latest_row, once per table and field set
+    
+    Returning the identical string every time also lets sqlite3's statement
+    cache reuse the prepared statement.
+    
+    Args:
+        model: ORM model of the table, used to skip fields this UPS does not have
+        fields (tuple): Column names to select
+        order_column: Column to sort by descending to get the latest row
+        
+    Returns:
+        str: The query, or None if the table has none of the fields
+    """
+    table_columns = model.__table__.columns
+    columns = [field for field in fields if field in table_columns]
+    if not columns:
+        return None
+    
+    query = f"SELECT {', '.join(columns)} FROM {model.__tablename__}"
+    if order_column:
+        query += f" ORDER BY {order_column} DESC"
+    return f"{query} LIMIT 1"
+
+def _read_latest_row(model, fields, order_column=None):
+    """
+    Read the given fields of a single row from a UPS data table
+    
+    Args:
+        model: ORM model of the table, used to skip fields this UPS does not have
+        fields (tuple): Column names to select
+        order_column: Column to sort by descending to get the latest row
+        
+    Returns:
+        sqlite3.Row: The row, or None if the table is empty or has none of the fields
+    """
+    query = _latest_row_sql(model, fields, order_column)
+    if query is None:
+        return None
+    
+    # Notification channels run in parallel threads and share the connection
+    with _readonly_lock:
+        return get_readonly_connection().execute(query).fetchone()
+
+@functools.lru_cache(maxsize=1)
+def _get_static_data():
+    """
+    Get the UPS static data row, read once per notifier process
+    
+    Returns:
+        dict: Column values of the first ups_static_data row, empty if none
+    """
+    if 'ups_static_data' not in _TABLES:
+        return {}
+    
+    static_record = _read_latest_row(get_static_model(db), _STATIC_INFO_FIELDS)
+    return dict(static_record) if static_record else {}
+
 def get_ups_info(ups_name):
     """
     Get UPS information from database
@@ -417,157 +563,80 @@ def get_ups_info(ups_name):
         dict: UPS information or default values on error
     """
     try:
-        log_message(f"DEBUG: Starting get_ups_info for {ups_name}", True)
+        log_message("DEBUG: Starting get_ups_info for %s", ups_name, is_debug=True)
         
         # Default UPS info with safe values
-        ups_info = {
-            'ups_model': 'Unknown UPS',
-            'device_serial': 'Unknown',
-            'ups_status': 'Unknown',
-            'battery_charge': '0%',
-            'runtime_estimate': '0 min',
-            'input_voltage': '0V',
-            'battery_voltage': '0V',
-            'ups_host': ups_name,
-            'battery_voltage_nominal': '0V',
-            'battery_type': 'Unknown',
-            'ups_timer_shutdown': '0',
-            'comm_duration': '0 min',
-            'battery_duration': '0 min',
-            'battery_age': 'Unknown',
-            'battery_efficiency': '0%'
-        }
+        ups_info = _UPS_INFO_DEFAULTS.copy()
+        ups_info['ups_host'] = ups_name
         
         # Get current date and time for the event
-        now = datetime.datetime.now()
-        local_tz = app.CACHE_TIMEZONE
-        if local_tz:
-            now = now.astimezone(local_tz)
+        now = datetime.datetime.now(LOCAL_TZ)
         
         # Format date and time for the template
         ups_info['event_date'] = now.strftime('%Y-%m-%d')
         ups_info['event_time'] = now.strftime('%H:%M:%S')
         
-        # Use ORM with dynamic SQL approach for maximum flexibility
+        # Models (for the per-UPS column list) and the engine URL need an app context
         with app.app_context():
             try:
-                # Get data using dynamic SQL through ORM
-                log_message("DEBUG: Querying UPS data using dynamic ORM query", True)
-                
-                # First check if tables exist
-                tables = inspect(db.engine).get_table_names()
-                log_message(f"DEBUG: Available tables in database: {tables}", True)
+                log_message("DEBUG: Querying UPS data from the read-only connection", is_debug=True)
                 
-                if 'ups_static_data' in tables:
-                    # Use pure ORM approach to get the static data
-                    from core.db.ups.models import get_static_model
-                    UPSStaticData = get_static_model(db)
-                    
-                    # Get the first record using ORM
-                    static_record = UPSStaticData.query.first()
-                    log_message(f"DEBUG: Got static data record: {static_record}", True)
+                # Static data does not change during a notifier run, read it once
+                static_data = _get_static_data()
+                if static_data:
+                    log_message("DEBUG: Static data retrieved: %s", static_data, is_debug=True)
                     
-                    if static_record:
-                        # Convert ORM object to dictionary
-                        static_data = {column.name: getattr(static_record, column.name) 
-                                      for column in static_record.__table__.columns}
-                        log_message(f"DEBUG: Static data retrieved: {static_data}", True)
-                        
-                        # Key fields we're interested in
-                        for field in ['device_model', 'device_serial', 'battery_type', 'ups_model']:
-                            if field in static_data and static_data[field] is not None:
-                                ups_info[field] = str(static_data[field])
-                                log_message(f"DEBUG: Set static value {field} = {ups_info[field]}", True)
+                    # Key fields we're interested in
+                    for field in _STATIC_INFO_FIELDS:
+                        if field in static_data and static_data[field] is not None:
+                            ups_info[field] = str(static_data[field])
+                            log_message("DEBUG: Set static value %s = %s", field, ups_info[field], is_debug=True)
                 
-                if 'ups_dynamic_data' in tables:
-                    # Use pure ORM approach to get the dynamic data
-                    from core.db.ups.models import get_ups_model
-                    UPSDynamicData = get_ups_model(db)
-                    
-                    # Get the most recent record using ORM
-                    dynamic_record = UPSDynamicData.query.order_by(UPSDynamicData.timestamp_utc.desc()).first()
-                    log_message(f"DEBUG: Got dynamic data record: {dynamic_record}", True)
+                if 'ups_dynamic_data' in _TABLES:
+                    # Get the most recent record, fetching only the columns we use
+                    dynamic_record = _read_latest_row(get_ups_model(db), _DYNAMIC_INFO_FIELDS, 'timestamp_utc')
                     
                     if dynamic_record:
-                        # Convert ORM object to dictionary
-                        dynamic_data = {column.name: getattr(dynamic_record, column.name) 
-                                       for column in dynamic_record.__table__.columns}
-                        log_message(f"DEBUG: Dynamic data retrieved: {dynamic_data}", True)
-                        
-                        # Handle ups_status
-                        if 'ups_status' in dynamic_data and dynamic_data['ups_status'] is not None:
-                            ups_info['ups_status'] = str(dynamic_data['ups_status'])
-                            log_message(f"DEBUG: Set dynamic value ups_status = {ups_info['ups_status']}", True)
-                        
-                        # Handle battery_charge
-                        if 'battery_charge' in dynamic_data and dynamic_data['battery_charge'] is not None:
-                            charge = str(dynamic_data['battery_charge'])
-                            if not charge.endswith('%'):
-                                charge = f"{charge}%"
-                            ups_info['battery_charge'] = charge
-                            log_message(f"DEBUG: Set dynamic value battery_charge = {ups_info['battery_charge']}", True)
-                        
-                        # Handle battery_runtime
-                        if 'battery_runtime' in dynamic_data and dynamic_data['battery_runtime'] is not None:
-                            runtime = str(dynamic_data['battery_runtime'])
-                            if runtime.isdigit():
-                                runtime_min = int(runtime) // 60
-                                ups_info['runtime_estimate'] = f"{runtime_min} min"
-                                log_message(f"DEBUG: Set dynamic value runtime_estimate = {ups_info['runtime_estimate']}", True)
-                        
-                        # Handle other voltage metrics with proper units
-                        for field, suffix in [
-                            ('input_voltage', 'V'),
-                            ('battery_voltage', 'V'),
-                            ('battery_voltage_nominal', 'V')
-                        ]:
-                            if field in dynamic_data and dynamic_data[field] is not None:
-                                value = str(dynamic_data[field])
-                                if not value.endswith(suffix):
-                                    value = f"{value}{suffix}"
-                                ups_info[field] = value
-                                log_message(f"DEBUG: Set dynamic value {field} = {ups_info[field]}", True)
-                        
-                        # Handle ups_timer_shutdown
-                        if 'ups_timer_shutdown' in dynamic_data and dynamic_data['ups_timer_shutdown'] is not None:
-                            ups_info['ups_timer_shutdown'] = str(dynamic_data['ups_timer_shutdown'])
-                            log_message(f"DEBUG: Set dynamic value ups_timer_shutdown = {ups_info['ups_timer_shutdown']}", True)
+                        # The row only holds the fields this UPS has: read them by name
+                        # straight off the sqlite3.Row, no intermediate dict
+                        if _DEBUG:
+                            log_message("DEBUG: Dynamic data retrieved: %s", tuple(dynamic_record), is_debug=True)
+                        for field in dynamic_record.keys():
+                            value = dynamic_record[field]
+                            if value is None:
+                                continue
+                            value = str(value)
+                            
+                            # battery_runtime is reported in seconds
+                            if field == 'battery_runtime':
+                                runtime = minutes_from_seconds(value)
+                                if runtime:
+                                    ups_info['runtime_estimate'] = runtime
+                                    log_message("DEBUG: Set dynamic value runtime_estimate = %s", ups_info['runtime_estimate'], is_debug=True)
+                                continue
+                            
+                            suffix = _DYNAMIC_INFO_SUFFIXES.get(field)
+                            ups_info[field] = with_suffix(value, suffix) if suffix else value
+                            log_message("DEBUG: Set dynamic value %s = %s", field, ups_info[field], is_debug=True)
             except Exception as e:
-                log_message(f"WARNING: Dynamic ORM query failed: {e}", True)
-                log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+                log_message("WARNING: UPS data query failed: %s", e, is_debug=True)
+                log_traceback()
         
-        log_message(f"DEBUG: Final UPS info: {ups_info}", True)
+        log_message("DEBUG: Final UPS info: %s", ups_info, is_debug=True)
         return ups_info
     
     except Exception as e:
         log_message(f"ERROR: Failed to get UPS info: {e}")
-        log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+        log_traceback()
         
         # Get current date and time even for default values
-        now = datetime.datetime.now()
-        local_tz = app.CACHE_TIMEZONE
-        if local_tz:
-            now = now.astimezone(local_tz)
+        now = datetime.datetime.now(LOCAL_TZ)
             
-        return {
-            'ups_model': 'Unknown UPS',
-            'device_serial': 'Unknown',
-            'ups_status': 'Unknown',
-            'battery_charge': '0%',
-            'runtime_estimate': '0 min',
-            'input_voltage': '0V',
-            'battery_voltage': '0V',
-            'ups_host': ups_name,
-            'battery_voltage_nominal': '0V',
-            'battery_type': 'Unknown',
-            'ups_timer_shutdown': '0',
-            'comm_duration': '0 min',
-            'battery_duration': '0 min',
-            'battery_age': 'Unknown',
-            'battery_efficiency': '0%',
-            'event_date': now.strftime('%Y-%m-%d'),
-            'event_time': now.strftime('%H:%M:%S')
-        }
+        ups_info = _UPS_INFO_DEFAULTS.copy()
+        ups_info['ups_host'] = ups_name
+        ups_info['event_date'] = now.strftime('%Y-%m-%d')
+        ups_info['event_time'] = now.strftime('%H:%M:%S')
+        return ups_info
 
 def get_source_ip():
     """Get the source IP address based on configuration"""
@@ -582,15 +651,91 @@ def get_source_ip():
             if nut_config:
                 return nut_config.ups_host
     except Exception as e:
-        log_message(f"Error getting UPS host from database: {e}", True)
+        log_message("Error getting UPS host from database: %s", e, is_debug=True)
     
     # Default to localhost
     return "127.0.0.1"
 
+# Events that were still open when the current event arrived:
+# {(ups_name, event_type): timezone-aware UTC start}. store_event_in_database closes
+# them before notifications go out, so this is what the duration calculations read.
+_OPEN_EVENTS = {}
+_open_events_lock = threading.Lock()
+_open_events_primed = False
+
+def _as_utc(value):
+    """Return a datetime as timezone-aware UTC (SQLite hands back naive values)"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+def get_open_event_start(ups_name, event_type):
+    """
+    Get when the open event of this type for the UPS began
+    
+    Served from _OPEN_EVENTS; the database is only queried if it was never primed.
+    
+    Args:
+        ups_name: Name of the UPS
+        event_type: Type of the open event (COMMBAD, ONBATT, ...)
+        
+    Returns:
+        datetime: Timezone-aware UTC start, or None if there is no open event
+    """
+    with _open_events_lock:
+        began = _OPEN_EVENTS.get((ups_name, event_type))
+    # Once primed, a miss means there was no open event
+    if began is not None or _open_events_primed:
+        return began
+    
+    # Only the start column is selected: no ORM object or identity-map entry is built
+    with app.app_context():
+        began = db.session.execute(
+            select(UPSEventModel.timestamp_utc).where(
+                UPSEventModel.ups_name == ups_name,
+                UPSEventModel.event_type == event_type,
+                UPSEventModel.timestamp_utc_end.is_(None)
+            ).order_by(UPSEventModel.timestamp_utc.desc()).limit(1)
+        ).scalar()
+    
+    return _as_utc(began)
+
+def prime_open_events():
+    """
+    Load the start of every open event into _OPEN_EVENTS with one grouped query
+    
+    Called once at startup, so neither close_previous_events nor the duration
+    calculations need a query of their own. Failures only cost that shortcut.
+    """
+    global _open_events_primed
+    try:
+        rows = db.session.execute(
+            select(
+                UPSEventModel.ups_name,
+                UPSEventModel.event_type,
+                func.max(UPSEventModel.timestamp_utc)
+            ).where(
+                UPSEventModel.timestamp_utc_end.is_(None)
+            ).group_by(UPSEventModel.ups_name, UPSEventModel.event_type)
+        ).all()
+    except Exception as e:
+        log_message("WARNING: Could not load open events: %s", e, is_debug=True)
+        return
+    
+    with _open_events_lock:
+        for ups_name, event_type, began in rows:
+            if began:
+                _OPEN_EVENTS[(ups_name, event_type)] = _as_utc(began)
+        _open_events_primed = True
+    log_message("DEBUG: Loaded %s open events", len(rows), is_debug=True)
+
 def close_previous_events(ups_name, current_time):
     """
     Close any open events for the specified UPS by setting their end timestamp.
     
+    The UPDATE is not committed here: store_event_in_database commits it
+    together with the new event so both land in a single transaction.
+    
     Args:
         ups_name: Name of the UPS
         current_time: Current timestamp to use as end time
@@ -598,26 +743,30 @@ def close_previous_events(ups_name, current_time):
     Returns:
         int: Number of events closed
     """
-    try:
-        # Find open events (where timestamp_utc_end is NULL)
-        open_events = UPSEventModel.query.filter_by(
-            ups_name=ups_name,
-            timestamp_utc_end=None
-        ).all()
+    open_filter = {'ups_name': ups_name, 'timestamp_utc_end': None}
+    
+    # Remember when the open events began, so the notifications for this event can
+    # report how long they lasted without reading them back. prime_open_events has
+    # usually done this already for every UPS.
+    if not _open_events_primed:
+        open_events = UPSEventModel.query.with_entities(
+            UPSEventModel.event_type,
+            UPSEventModel.timestamp_utc
+        ).filter_by(**open_filter).order_by(UPSEventModel.timestamp_utc).all()
+        with _open_events_lock:
+            for open_event in open_events:
+                if open_event.timestamp_utc:
+                    _OPEN_EVENTS[(ups_name, open_event.event_type)] = _as_utc(open_event.timestamp_utc)
+    
+    # Close open events (where timestamp_utc_end is NULL) with a single UPDATE
+    count = UPSEventModel.query.filter_by(
+        **open_filter
+    ).update({'timestamp_utc_end': current_time}, synchronize_session=False)
         
-        count = 0
-        for event in open_events:
-            event.timestamp_utc_end = current_time
-            count += 1
-            
-        if count > 0:
-            db.session.commit()
-            log_message(f"Closed {count} previous events for {ups_name}")
-            
-        return count
-    except Exception as e:
-        log_message(f"ERROR: Failed to close previous events: {e}")
-        return 0
+    if count > 0:
+        log_message(f"Closing {count} previous events for {ups_name}")
+        
+    return count
 
 def store_event_in_database(ups_name, event_type):
     """
@@ -651,6 +800,7 @@ def store_event_in_database(ups_name, event_type):
             acknowledged=False
         )
         
+        # One commit for both the UPDATE above and the INSERT
         db.session.add(event)
         db.session.commit()
         
@@ -658,6 +808,7 @@ def store_event_in_database(ups_name, event_type):
         return True
     
     except Exception as e:
+        db.session.rollback()
         log_message(f"ERROR: Failed to store event in database: {e}")
         return False
 
@@ -682,6 +833,60 @@ def verify_email_config():
         logger.error(f"Failed to verify email configuration: {str(e)}")
         return False
 
+# Email subject per event type, formatted with the UPS name
+EMAIL_SUBJECTS = {
+    'ONLINE': "✅ Power Restored - {ups_name}",
+    'ONBATT': "⚡ On Battery Power - {ups_name}",
+    'LOWBATT': "⚠️ CRITICAL: Low Battery - {ups_name}",
+    'COMMBAD': "❌ Communication Lost - {ups_name}",
+    'COMMOK': "✅ Communication Restored - {ups_name}",
+    'SHUTDOWN': "⚠️ CRITICAL: System Shutdown - {ups_name}",
+    'REPLBATT': "🔋 Battery Replacement Required - {ups_name}",
+    'NOCOMM': "❌ No Communication - {ups_name}",
+    'NOPARENT': "⚙️ Process Error - {ups_name}",
+    'FSD': "⚠️ CRITICAL: Forced Shutdown - {ups_name}"
+}
+
+def get_last_onbatt_duration_minutes(ups_name, now):
+    """
+    Get how long the UPS ran on battery, from its most recent ONBATT event
+    
+    Uses the time since the event began while it is still open, or the event's
+    own duration if it was closed less than an hour before `now`.
+    
+    Args:
+        ups_name: Name of the UPS
+        now: Current timezone-aware datetime
+        
+    Returns:
+        int: Duration in minutes, or None if no related ONBATT event exists
+    """
+    with _open_events_lock:
+        began = _OPEN_EVENTS.get((ups_name, 'ONBATT'))
+    if began is not None:
+        return int((now - began).total_seconds() / 60)
+    
+    last_event = UPSEventModel.query.with_entities(
+        UPSEventModel.timestamp_utc,
+        UPSEventModel.timestamp_utc_end
+    ).filter_by(
+        ups_name=ups_name,
+        event_type='ONBATT'
+    ).order_by(UPSEventModel.timestamp_utc.desc()).first()
+    
+    if not last_event or not last_event.timestamp_utc:
+        return None
+    
+    # SQLite hands back naive datetimes even for timezone=True columns
+    began = _as_utc(last_event.timestamp_utc)
+    ended = _as_utc(last_event.timestamp_utc_end)
+    if ended is None:
+        return int((now - began).total_seconds() / 60)
+    
+    if (now - ended).total_seconds() < 3600:
+        return int((ended - began).total_seconds() / 60)
+    return None
+
 def send_email_notification(ups_name, event_type, notification):
     """
     Send an email notification
@@ -692,10 +897,7 @@ def send_email_notification(ups_name, event_type, notification):
         notification: Notification object with type and config_id
     """
     try:
-        # Import get_timezone function as a lambda to get app.CACHE_TIMEZONE
-        timezone_getter = lambda: app.CACHE_TIMEZONE
-        
-        log_message("📧 Preparing to send email notification", True)
+        log_message("📧 Preparing to send email notification", is_debug=True)
         
         # Import get_encryption_key directly - we already set SECRET_KEY properly
         from core.mail.mail import get_encryption_key
@@ -704,64 +906,17 @@ def send_email_notification(ups_name, event_type, notification):
         ups_info = get_ups_info(ups_name)
         
         # Generate email subject based on event type
-        event_subjects = {
-            'ONLINE': f"✅ Power Restored - {ups_name}",
-            'ONBATT': f"⚡ On Battery Power - {ups_name}",
-            'LOWBATT': f"⚠️ CRITICAL: Low Battery - {ups_name}",
-            'COMMBAD': f"❌ Communication Lost - {ups_name}",
-            'COMMOK': f"✅ Communication Restored - {ups_name}",
-            'SHUTDOWN': f"⚠️ CRITICAL: System Shutdown - {ups_name}",
-            'REPLBATT': f"🔋 Battery Replacement Required - {ups_name}",
-            'NOCOMM': f"❌ No Communication - {ups_name}",
-            'NOPARENT': f"⚙️ Process Error - {ups_name}",
-            'FSD': f"⚠️ CRITICAL: Forced Shutdown - {ups_name}"
-        }
-        
-        subject = event_subjects.get(event_type, f"UPS Event: {event_type} - {ups_name}")
-        
-        # Initialize the email notifier
-        log_message("DEBUG: Initializing EmailNotifier", True)
-        notifier = EmailNotifier()
+        subject = EMAIL_SUBJECTS.get(event_type, "UPS Event: {event_type} - {ups_name}").format(
+            event_type=event_type, ups_name=ups_name
+        )
         
         # Get current date and time for the event
-        now = datetime.datetime.now()
-        local_tz = app.CACHE_TIMEZONE
-        if local_tz:
-            now = now.astimezone(local_tz)
+        now = datetime.datetime.now(LOCAL_TZ)
         
         # Format date and time for the template
         event_date = now.strftime('%Y-%m-%d')
         event_time = now.strftime('%H:%M:%S')
         
-        # Make sure battery charge has % symbol
-        battery_charge = ups_info.get('battery_charge', '0')
-        if not battery_charge.endswith('%'):
-            battery_charge = f"{battery_charge}%"
-            
-        # Make sure voltage values have V suffix
-        input_voltage = ups_info.get('input_voltage', '0')
-        if not input_voltage.endswith('V'):
-            input_voltage = f"{input_voltage}V"
-            
-        battery_voltage = ups_info.get('battery_voltage', '0')
-        if not battery_voltage.endswith('V'):
-            battery_voltage = f"{battery_voltage}V"
-        
-        # Make sure runtime has min suffix
-        runtime_estimate = ups_info.get('runtime_estimate', '0')
-        if not runtime_estimate.endswith('min'):
-            runtime_estimate = f"{runtime_estimate} min"
-        
-        # Set battery_duration (for ONLINE notifications) - how long it was on battery
-        battery_duration = ups_info.get('battery_duration', '0 min')
-        if not battery_duration.endswith('min'):
-            battery_duration = f"{battery_duration} min"
-            
-        # Set comm_duration (for COMMOK notifications) - how long it was without communication
-        comm_duration = ups_info.get('comm_duration', '0 min')
-        if not comm_duration.endswith('min'):
-            comm_duration = f"{comm_duration} min"
-            
         # Get the server_name ONLY from the database with no fallbacks
         server_name = None
         try:
@@ -774,9 +929,9 @@ def send_email_notification(ups_name, event_type, notification):
             
             # Get server name directly from the model
             server_name = InitialSetupModel.get_server_name()
-            log_message(f"DEBUG: Retrieved server name: {server_name} from database", True)
+            log_message("DEBUG: Retrieved server name: %s from database", server_name, is_debug=True)
         except Exception as e:
-            log_message(f"ERROR: Failed to get server name from database: {str(e)}", True)
+            log_message("ERROR: Failed to get server name from database: %s", e, is_debug=True)
             # Don't raise the exception, continue without server name
             server_name = "Unknown Server"
         
@@ -788,15 +943,16 @@ def send_email_notification(ups_name, event_type, notification):
             'id_email': notification['config_id'],
             'event_date': event_date,
             'event_time': event_time,
-            'battery_charge': battery_charge,
-            'input_voltage': input_voltage, 
-            'battery_voltage': battery_voltage,
-            'runtime_estimate': runtime_estimate,
+            # get_ups_info already returns these with their unit suffixes
+            'battery_charge': ups_info['battery_charge'],
+            'input_voltage': ups_info['input_voltage'],
+            'battery_voltage': ups_info['battery_voltage'],
+            'runtime_estimate': ups_info['runtime_estimate'],
             'ups_model': ups_info.get('ups_model') or ups_info.get('device_model') or 'UPS Device',
             'ups_status': ups_info.get('ups_status', 'Unknown'),
             'device_serial': ups_info.get('device_serial', 'Unknown'),
-            'battery_duration': battery_duration,
-            'comm_duration': comm_duration,
+            'battery_duration': ups_info['battery_duration'],
+            'comm_duration': ups_info['comm_duration'],
             'battery_type': ups_info.get('battery_type', 'Unknown'),
             'ups_mfr': ups_info.get('ups_mfr', ''),
             'battery_voltage_nominal': ups_info.get('battery_voltage_nominal', '0V'),
@@ -809,43 +965,14 @@ def send_email_notification(ups_name, event_type, notification):
         # Calculate additional fields if needed for specific event types
         if event_type == 'ONLINE':
             try:
-                # Check if we have an open event that we can use to calculate duration
+                # The latest ONBATT event answers both cases: still open, or closed recently
                 with app.app_context():
-                    # Look for open ONBATT events
-                    open_event = UPSEventModel.query.filter_by(
-                        ups_name=ups_name,
-                        event_type='ONBATT',
-                        timestamp_utc_end=None
-                    ).order_by(UPSEventModel.timestamp_utc.desc()).first()
-                    
-                    if open_event and open_event.timestamp_utc:
-                        # Calculate duration in minutes
-                        duration_seconds = (now - open_event.timestamp_utc).total_seconds()
-                        duration_minutes = int(duration_seconds / 60)
+                    duration_minutes = get_last_onbatt_duration_minutes(ups_name, now)
+                    if duration_minutes is not None:
                         event_data['battery_duration'] = f"{duration_minutes} min"
-                        log_message(f"DEBUG: Calculated battery_duration from open event: {event_data['battery_duration']}", True)
+                        log_message("DEBUG: Calculated battery_duration from ONBATT event: %s", event_data['battery_duration'], is_debug=True)
                     else:
-                        # If there's no open event, find the most recent ONBATT event with an end time
-                        closed_events = UPSEventModel.query.filter_by(
-                            ups_name=ups_name,
-                            event_type='ONBATT'
-                        ).filter(UPSEventModel.timestamp_utc_end != None).order_by(UPSEventModel.timestamp_utc.desc()).limit(5).all()
-                        
-                        log_message(f"DEBUG: Found {len(closed_events)} closed ONBATT events", True)
-                        
-                        if closed_events:
-                            # Find the most recent one that's likely to be related to this ONLINE event
-                            for event in closed_events:
-                                # Check if the event ended within the last hour
-                                if event.timestamp_utc_end and (now - event.timestamp_utc_end).total_seconds() < 3600:
-                                    if event.timestamp_utc:
-                                        duration_seconds = (event.timestamp_utc_end - event.timestamp_utc).total_seconds()
-                                        duration_minutes = int(duration_seconds / 60)
-                                        event_data['battery_duration'] = f"{duration_minutes} min"
-                                        log_message(f"DEBUG: Calculated battery_duration from closed event: {event_data['battery_duration']}", True)
-                                        break
-                        
-                        # If we still don't have a duration, look at UPS statistics
+                        # No related ONBATT event, look at UPS statistics
                         if 'battery_duration' not in event_data or event_data['battery_duration'] == '0 min':
                             # Try to get it from known runtime stats
                             if 'device_uptime' in event_data and event_data['device_uptime'].isdigit():
@@ -853,54 +980,47 @@ def send_email_notification(ups_name, event_type, notification):
                                 uptime_min = int(event_data['device_uptime']) // 60
                                 if uptime_min < 60:  # If uptime is less than 60 minutes, it's likely from a restart
                                     event_data['battery_duration'] = f"{uptime_min} min"
-                                    log_message(f"DEBUG: Estimated battery_duration from device_uptime: {event_data['battery_duration']}", True)
+                                    log_message("DEBUG: Estimated battery_duration from device_uptime: %s", event_data['battery_duration'], is_debug=True)
             except Exception as e:
-                log_message(f"WARNING: Could not calculate battery_duration: {e}", True)
-                log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+                log_message("WARNING: Could not calculate battery_duration: %s", e, is_debug=True)
+                log_traceback()
         
         # Calculate communication outage duration for COMMOK events
         elif event_type == 'COMMOK':
             try:
                 # For COMMOK events, try to estimate how long communication was lost
                 # Check if we have an open event that we can use to calculate duration
-                with app.app_context():
-                    open_event = UPSEventModel.query.filter_by(
-                        ups_name=ups_name,
-                        event_type='COMMBAD',
-                        timestamp_utc_end=None
-                    ).order_by(UPSEventModel.timestamp_utc.desc()).first()
-                    
-                    if open_event and open_event.timestamp_utc:
-                        # Calculate duration in minutes
-                        duration_seconds = (now - open_event.timestamp_utc).total_seconds()
-                        duration_minutes = int(duration_seconds / 60)
-                        event_data['comm_duration'] = f"{duration_minutes} min"
-                        log_message(f"DEBUG: Calculated comm_duration = {event_data['comm_duration']}", True)
+                began = get_open_event_start(ups_name, 'COMMBAD')
+                if began:
+                    # Calculate duration in minutes
+                    duration_minutes = int((now - began).total_seconds() / 60)
+                    event_data['comm_duration'] = f"{duration_minutes} min"
+                    log_message("DEBUG: Calculated comm_duration = %s", event_data['comm_duration'], is_debug=True)
             except Exception as e:
-                log_message(f"WARNING: Could not calculate comm_duration: {e}", True)
-                log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+                log_message("WARNING: Could not calculate comm_duration: %s", e, is_debug=True)
+                log_traceback()
         
         # Log the prepared event data
-        log_message(f"DEBUG: Prepared event data for template: {event_data}", True)
+        log_message("DEBUG: Prepared event data for template: %s", event_data, is_debug=True)
         
         # Send notification using the existing email system
-        log_message("DEBUG: Calling notifier.send_notification()", True)
+        log_message("DEBUG: Calling EmailNotifier.send_notification()", is_debug=True)
         try:
-            success, message = notifier.send_notification(event_type, event_data)
+            success, message = EmailNotifier.send_notification(event_type, event_data)
             
-            log_message(f"DEBUG: Send notification result: success={success}, message={message}", True)
+            log_message("DEBUG: Send notification result: success=%s, message=%s", success, message, is_debug=True)
             
             if success:
                 log_message(f"Sent {event_type} notification for {ups_name} using email config {notification['config_id']}")
             else:
                 log_message(f"ERROR: Failed to send notification: {message}")
         except Exception as send_err:
-            log_message(f"ERROR: Exception in notifier.send_notification(): {str(send_err)}", True)
-            log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+            log_message("ERROR: Exception in EmailNotifier.send_notification(): %s", send_err, is_debug=True)
+            log_traceback()
             
     except Exception as e:
         log_message(f"ERROR: Failed to send notification: {str(e)}")
-        log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+        log_traceback()
 
 def get_enabled_ntfy_configs(event_type):
     """
@@ -913,7 +1033,7 @@ def get_enabled_ntfy_configs(event_type):
         list: List of Ntfy configurations
     """
     if not HAS_NTFY or not NtfyConfigModel:
-        log_message("Ntfy module not available, skipping ntfy notifications", True)
+        log_message("Ntfy module not available, skipping ntfy notifications", is_debug=True)
         return []
         
     try:
@@ -928,23 +1048,144 @@ def get_enabled_ntfy_configs(event_type):
             
             if configs:
                 # Log details of each configuration
-                log_message(f"Found {len(configs)} Ntfy configs for {event_type}:", True)
+                log_message("Found %s Ntfy configs for %s:", len(configs), event_type, is_debug=True)
                 for config in configs:
-                    log_message(f"  - Config ID: {config.id}, Server: {config.server}, Topic: {config.topic}, Default: {config.is_default}", True)
+                    log_message("  - Config ID: %s, Server: %s, Topic: %s, Default: %s", config.id, config.server, config.topic, config.is_default, is_debug=True)
                 
                 # Convert to dictionaries for use in send_ntfy_notification
                 config_dicts = [config.to_dict() for config in configs]
                 return config_dicts
             else:
-                log_message(f"No enabled Ntfy configs found for {event_type}", True)
+                log_message("No enabled Ntfy configs found for %s", event_type, is_debug=True)
                 return []
                 
     except Exception as e:
         log_message(f"ERROR: Failed to get enabled Ntfy configs: {str(e)}")
-        log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+        log_traceback()
         return []
 
-def send_ntfy_notification(ups_name, event_type, config):
+# Ntfy title per event type (ASCII only, no emoji to avoid encoding issues)
+NTFY_TITLES = {
+    "ONLINE": "UPS Online - {ups_name}",
+    "ONBATT": "UPS On Battery - {ups_name}",
+    "LOWBATT": "UPS Low Battery - {ups_name}",
+    "COMMOK": "UPS Communication Restored - {ups_name}",
+    "COMMBAD": "UPS Communication Lost - {ups_name}",
+    "SHUTDOWN": "System Shutdown Imminent - {ups_name}",
+    "REPLBATT": "UPS Battery Needs Replacement - {ups_name}",
+    "NOCOMM": "UPS Not Reachable - {ups_name}",
+    "NOPARENT": "Parent Process Lost - {ups_name}",
+    "FSD": "UPS Forced Shutdown - {ups_name}"
+}
+
+# Ntfy message per event type, followed by the formatted UPS details
+NTFY_MESSAGES = {
+    "ONLINE": "🔌 Power has been restored! UPS {ups_name} is now running on line power.\n\n{details}",
+    "ONBATT": "⚠️ POWER FAILURE DETECTED! UPS {ups_name} is now running on battery power.\n\n{details}",
+    "LOWBATT": "🚨 CRITICAL ALERT! UPS {ups_name} has critically low battery level. Shutdown imminent!\n\n{details}",
+    "COMMOK": "✅ Communication with UPS {ups_name} has been restored.\n\n{details}",
+    "COMMBAD": "❌ WARNING! Communication with UPS {ups_name} has been lost.\n\n{details}",
+    "SHUTDOWN": "🚨 CRITICAL! System on UPS {ups_name} is shutting down due to power issues.\n\n{details}",
+    "REPLBATT": "🔋 The battery of UPS {ups_name} needs to be replaced.\n\n{details}",
+    "NOCOMM": "❌ WARNING! No communication with UPS {ups_name} for an extended period.\n\n{details}",
+    "NOPARENT": "⚠️ The parent process monitoring UPS {ups_name} has died.\n\n{details}",
+    "FSD": "🚨 EMERGENCY! UPS {ups_name} is performing a forced shutdown.\n\n{details}"
+}
+
+# Ntfy tags per event type
+NTFY_TAGS = {
+    "ONLINE": "white_check_mark",
+    "ONBATT": "battery",
+    "LOWBATT": "warning,battery",
+    "COMMOK": "signal_strength",
+    "COMMBAD": "no_mobile_phones",
+    "SHUTDOWN": "sos,warning",
+    "REPLBATT": "wrench,battery",
+    "NOCOMM": "no_entry,warning",
+    "NOPARENT": "ghost",
+    "FSD": "sos,warning"
+}
+
+# Ntfy priority per event type; other events use the configuration's priority
+NTFY_PRIORITIES = {
+    "LOWBATT": 5,  # Emergency
+    "SHUTDOWN": 5, # Emergency
+    "FSD": 5,      # Emergency
+    "ONBATT": 4,   # High
+    "COMMBAD": 4,  # High
+    "NOCOMM": 4,   # High
+    "REPLBATT": 3, # Normal
+    "NOPARENT": 3, # Normal
+    "ONLINE": 3,   # Normal
+    "COMMOK": 2    # Low
+}
+
+def prepare_ntfy_ups_info(ups_name, event_type, snapshot=None):
+    """
+    Gather the UPS information shown in Ntfy notifications for an event
+    
+    Args:
+        ups_name (str): Name of the UPS
+        event_type (str): Type of event
+        snapshot (Mapping, optional): Result of get_detailed_ups_info to reuse
+        
+    Returns:
+        dict: UPS information including the ONLINE/COMMOK outage durations
+    """
+    # Get UPS information for message content - more detailed retrieval
+    ups_info = dict(snapshot) if snapshot is not None else get_detailed_ups_info(ups_name)
+    log_message("DEBUG: Ntfy received UPS info: %s", ups_info, is_debug=True)
+    
+    # Get current date and time
+    now = datetime.datetime.now(LOCAL_TZ)
+    
+    # Add event date and time for all notifications
+    ups_info['event_date'] = now.strftime('%Y-%m-%d')
+    ups_info['event_time'] = now.strftime('%H:%M:%S')
+    
+    # For ONLINE events, try to calculate how long the UPS was on battery
+    if event_type == 'ONLINE':
+        try:
+            # The latest ONBATT event answers both cases: still open, or closed recently
+            with app.app_context():
+                duration_minutes = get_last_onbatt_duration_minutes(ups_name, now)
+            if duration_minutes is not None:
+                ups_info['battery_duration'] = f"{duration_minutes} min"
+                log_message("DEBUG: Calculated battery_duration from ONBATT event: %s", ups_info['battery_duration'], is_debug=True)
+            elif ups_info.get('battery_duration', '0 min') == '0 min' and str(ups_info.get('device_uptime', '')).isdigit():
+                # No related ONBATT event: use device uptime as a fallback (likely restart after power off)
+                uptime_min = int(ups_info['device_uptime']) // 60
+                if uptime_min < 60:  # If uptime is less than 60 minutes, it's likely from a restart
+                    ups_info['battery_duration'] = f"{uptime_min} min"
+                    log_message("DEBUG: Estimated battery_duration from device_uptime: %s", ups_info['battery_duration'], is_debug=True)
+        except Exception as e:
+            log_message("WARNING: Could not calculate battery_duration: %s", e, is_debug=True)
+            log_traceback()
+    
+    # For COMMOK events, try to calculate how long communication was lost
+    elif event_type == 'COMMOK':
+        try:
+            # Check if we have an open event that we can use to calculate duration
+            began = get_open_event_start(ups_name, 'COMMBAD')
+            if began:
+                # Calculate duration in minutes
+                duration_minutes = int((now - began).total_seconds() / 60)
+                ups_info['comm_duration'] = f"{duration_minutes} min"
+                log_message("DEBUG: Calculated comm_duration = %s", ups_info['comm_duration'], is_debug=True)
+        except Exception as e:
+            log_message("WARNING: Could not calculate comm_duration: %s", e, is_debug=True)
+            log_traceback()
+    
+    # get_detailed_ups_info already added the units; only the durations set above are new
+    ups_info['comm_duration'] = with_suffix(ups_info.get('comm_duration', '0 min'), 'min', ' ')
+    ups_info['ups_model'] = ups_info.get('ups_model') or ups_info.get('device_model') or 'UPS Device'
+    ups_info['ups_host'] = ups_name
+    
+    log_message("DEBUG: Ntfy formatted UPS info: %s", ups_info, is_debug=True)
+    
+    return ups_info
+
+def send_ntfy_notification(ups_name, event_type, config, ups_info=None):
     """
     Send a notification via Ntfy with comprehensive UPS information
     
@@ -952,229 +1193,41 @@ def send_ntfy_notification(ups_name, event_type, config):
         ups_name (str): Name of the UPS
         event_type (str): Type of event
         config (dict): Ntfy configuration
+        ups_info (Mapping, optional): Prepared UPS information, from prepare_ntfy_ups_info
     """
     if not HAS_NTFY:
-        log_message("Ntfy not available, skipping notification", True)
+        log_message("Ntfy not available, skipping notification", is_debug=True)
         return
         
     try:
         # Log which configuration is being used
-        log_message(f"DEBUG: Sending Ntfy notification for {event_type} using config ID {config.get('id')} (server: {config.get('server')})", True)
-        
-        # Get UPS information for message content - more detailed retrieval
-        ups_info = get_detailed_ups_info(ups_name)
-        log_message(f"DEBUG: Ntfy received UPS info: {ups_info}", True)
-        
-        # Get current date and time
-        now = datetime.datetime.now(app.CACHE_TIMEZONE)
-        
-        # Add event date and time for all notifications
-        ups_info['event_date'] = now.strftime('%Y-%m-%d')
-        ups_info['event_time'] = now.strftime('%H:%M:%S')
+        log_message("DEBUG: Sending Ntfy notification for %s using config ID %s (server: %s)", event_type, config.get('id'), config.get('server'), is_debug=True)
         
-        # For ONLINE events, try to calculate how long the UPS was on battery
-        if event_type == 'ONLINE':
-            try:
-                # Check if we have an open event that we can use to calculate duration
-                with app.app_context():
-                    # Look for open ONBATT events
-                    open_event = UPSEventModel.query.filter_by(
-                        ups_name=ups_name,
-                        event_type='ONBATT',
-                        timestamp_utc_end=None
-                    ).order_by(UPSEventModel.timestamp_utc.desc()).first()
-                    
-                    if open_event and open_event.timestamp_utc:
-                        # Calculate duration in minutes
-                        duration_seconds = (now - open_event.timestamp_utc).total_seconds()
-                        duration_minutes = int(duration_seconds / 60)
-                        ups_info['battery_duration'] = f"{duration_minutes} min"
-                        log_message(f"DEBUG: Calculated battery_duration from open event: {ups_info['battery_duration']}", True)
-                    else:
-                        # If there's no open event, find the most recent ONBATT event with an end time
-                        closed_events = UPSEventModel.query.filter_by(
-                            ups_name=ups_name,
-                            event_type='ONBATT'
-                        ).filter(UPSEventModel.timestamp_utc_end != None).order_by(UPSEventModel.timestamp_utc.desc()).limit(5).all()
-                        
-                        log_message(f"DEBUG: Found {len(closed_events)} closed ONBATT events", True)
-                        
-                        if closed_events:
-                            # Find the most recent one that's likely to be related to this ONLINE event
-                            for event in closed_events:
-                                # Check if the event ended within the last hour
-                                if event.timestamp_utc_end and (now - event.timestamp_utc_end).total_seconds() < 3600:
-                                    if event.timestamp_utc:
-                                        duration_seconds = (event.timestamp_utc_end - event.timestamp_utc).total_seconds()
-                                        duration_minutes = int(duration_seconds / 60)
-                                        ups_info['battery_duration'] = f"{duration_minutes} min"
-                                        log_message(f"DEBUG: Calculated battery_duration from closed event: {ups_info['battery_duration']}", True)
-                                        break
-                        
-                        # If we still don't have a duration, look at UPS statistics
-                        if 'battery_duration' not in ups_info or ups_info['battery_duration'] == '0 min':
-                            # Try to get it from known runtime stats
-                            if 'device_uptime' in ups_info and ups_info['device_uptime'].isdigit():
-                                # Use device uptime as a fallback (likely restart after power off)
-                                uptime_min = int(ups_info['device_uptime']) // 60
-                                if uptime_min < 60:  # If uptime is less than 60 minutes, it's likely from a restart
-                                    ups_info['battery_duration'] = f"{uptime_min} min"
-                                    log_message(f"DEBUG: Estimated battery_duration from device_uptime: {ups_info['battery_duration']}", True)
-            except Exception as e:
-                log_message(f"WARNING: Could not calculate battery_duration: {e}", True)
-                log_message(f"TRACEBACK: {traceback.format_exc()}", True)
-        
-        # For COMMOK events, try to calculate how long communication was lost
-        elif event_type == 'COMMOK':
-            try:
-                # Check if we have an open event that we can use to calculate duration
-                with app.app_context():
-                    open_event = UPSEventModel.query.filter_by(
-                        ups_name=ups_name,
-                        event_type='COMMBAD',
-                        timestamp_utc_end=None
-                    ).order_by(UPSEventModel.timestamp_utc.desc()).first()
-                    
-                    if open_event and open_event.timestamp_utc:
-                        # Calculate duration in minutes
-                        duration_seconds = (now - open_event.timestamp_utc).total_seconds()
-                        duration_minutes = int(duration_seconds / 60)
-                        ups_info['comm_duration'] = f"{duration_minutes} min"
-                        log_message(f"DEBUG: Calculated comm_duration = {ups_info['comm_duration']}", True)
-            except Exception as e:
-                log_message(f"WARNING: Could not calculate comm_duration: {e}", True)
-                log_message(f"TRACEBACK: {traceback.format_exc()}", True)
-        
-        # Ensure data is properly formatted for notification
-        # Make sure battery charge has % symbol
-        battery_charge = ups_info.get('battery_charge', '0')
-        if not battery_charge.endswith('%'):
-            battery_charge = f"{battery_charge}%"
-            
-        # Make sure voltage values have V suffix
-        input_voltage = ups_info.get('input_voltage', '0')
-        if not input_voltage.endswith('V'):
-            input_voltage = f"{input_voltage}V"
-            
-        battery_voltage = ups_info.get('battery_voltage', '0') 
-        if not battery_voltage.endswith('V'):
-            battery_voltage = f"{battery_voltage}V"
-        
-        # Make sure runtime has min suffix and is converted from seconds if needed
-        if 'battery_runtime' in ups_info and ups_info['battery_runtime'].isdigit():
-            runtime_min = int(ups_info['battery_runtime']) // 60
-            ups_info['runtime_estimate'] = f"{runtime_min} min"
-            log_message(f"DEBUG: Calculated runtime_estimate from battery_runtime: {ups_info['runtime_estimate']}", True)
-        elif 'runtime_estimate' in ups_info and not ups_info['runtime_estimate'].endswith('min'):
-            ups_info['runtime_estimate'] = f"{ups_info['runtime_estimate']} min"
-            
-        # Make sure we always have some value for runtime_estimate
-        if 'runtime_estimate' not in ups_info or ups_info['runtime_estimate'] == '0 min':
-            # Try to get it from battery_runtime_low
-            if 'battery_runtime_low' in ups_info and ups_info['battery_runtime_low'].isdigit():
-                runtime_min = int(ups_info['battery_runtime_low']) // 60
-                ups_info['runtime_estimate'] = f"{runtime_min} min"
-                log_message(f"DEBUG: Used battery_runtime_low as fallback for runtime_estimate: {ups_info['runtime_estimate']}", True)
-            # If still not available, try battery_charge and a simple estimation
-            elif 'battery_charge' in ups_info:
-                charge = ups_info['battery_charge']
-                if charge.endswith('%'):
-                    charge = charge[:-1]
-                if charge.isdigit():
-                    # Simple estimation: 1% charge = 1 minute runtime (very rough approximation)
-                    charge_value = int(charge)
-                    ups_info['runtime_estimate'] = f"{charge_value} min" 
-                    log_message(f"DEBUG: Estimated runtime from battery charge: {ups_info['runtime_estimate']}", True)
-        
-        # Make sure comm_duration has min suffix
-        comm_duration = ups_info.get('comm_duration', '0 min')
-        if not comm_duration.endswith('min'):
-            comm_duration = f"{comm_duration} min"
-        
-        # Update UPS info with formatted values
-        ups_info['battery_charge'] = battery_charge
-        ups_info['input_voltage'] = input_voltage
-        ups_info['battery_voltage'] = battery_voltage
-        ups_info['runtime_estimate'] = ups_info['runtime_estimate']
-        ups_info['comm_duration'] = comm_duration
-        ups_info['ups_model'] = ups_info.get('ups_model') or ups_info.get('device_model') or 'UPS Device'
-        ups_info['ups_host'] = ups_name
-        
-        log_message(f"DEBUG: Ntfy formatted UPS info: {ups_info}", True)
-        
-        # Generate event title based on event type (ASCII only, no emoji to avoid encoding issues)
-        event_titles = {
-            "ONLINE": f"UPS Online - {ups_name}",
-            "ONBATT": f"UPS On Battery - {ups_name}",
-            "LOWBATT": f"UPS Low Battery - {ups_name}",
-            "COMMOK": f"UPS Communication Restored - {ups_name}",
-            "COMMBAD": f"UPS Communication Lost - {ups_name}",
-            "SHUTDOWN": f"System Shutdown Imminent - {ups_name}",
-            "REPLBATT": f"UPS Battery Needs Replacement - {ups_name}",
-            "NOCOMM": f"UPS Not Reachable - {ups_name}",
-            "NOPARENT": f"Parent Process Lost - {ups_name}",
-            "FSD": f"UPS Forced Shutdown - {ups_name}"
-        }
+        # Shared by all configurations when called from send_ntfy_notifications
+        if ups_info is None:
+            ups_info = prepare_ntfy_ups_info(ups_name, event_type)
         
-        title = event_titles.get(event_type, f"UPS Event: {event_type} - {ups_name}")
+        # Title and message templates are expanded only for this event type
+        title = NTFY_TITLES.get(event_type, "UPS Event: {event_type} - {ups_name}").format(
+            ups_name=ups_name, event_type=event_type
+        )
         
         # Create detailed, formatted message based on the event type
         details = format_ups_details(ups_info)
         
-        # Create event message based on the type
-        event_messages = {
-            "ONLINE": f"🔌 Power has been restored! UPS {ups_name} is now running on line power.\n\n{details}",
-            "ONBATT": f"⚠️ POWER FAILURE DETECTED! UPS {ups_name} is now running on battery power.\n\n{details}",
-            "LOWBATT": f"🚨 CRITICAL ALERT! UPS {ups_name} has critically low battery level. Shutdown imminent!\n\n{details}",
-            "COMMOK": f"✅ Communication with UPS {ups_name} has been restored.\n\n{details}",
-            "COMMBAD": f"❌ WARNING! Communication with UPS {ups_name} has been lost.\n\n{details}",
-            "SHUTDOWN": f"🚨 CRITICAL! System on UPS {ups_name} is shutting down due to power issues.\n\n{details}",
-            "REPLBATT": f"🔋 The battery of UPS {ups_name} needs to be replaced.\n\n{details}",
-            "NOCOMM": f"❌ WARNING! No communication with UPS {ups_name} for an extended period.\n\n{details}",
-            "NOPARENT": f"⚠️ The parent process monitoring UPS {ups_name} has died.\n\n{details}",
-            "FSD": f"🚨 EMERGENCY! UPS {ups_name} is performing a forced shutdown.\n\n{details}"
-        }
-        
-        message = event_messages.get(event_type, f"UPS {ups_name} reports status: {event_type}\n\n{details}")
-        
-        # Get tag for the event type
-        tag_map = {
-            "ONLINE": "white_check_mark",
-            "ONBATT": "battery",
-            "LOWBATT": "warning,battery",
-            "COMMOK": "signal_strength",
-            "COMMBAD": "no_mobile_phones",
-            "SHUTDOWN": "sos,warning",
-            "REPLBATT": "wrench,battery",
-            "NOCOMM": "no_entry,warning",
-            "NOPARENT": "ghost",
-            "FSD": "sos,warning"
-        }
-        
-        tags = tag_map.get(event_type, "")
-        
-        # Set priority based on event type
-        priority_map = {
-            "LOWBATT": 5,  # Emergency
-            "SHUTDOWN": 5, # Emergency
-            "FSD": 5,      # Emergency
-            "ONBATT": 4,   # High
-            "COMMBAD": 4,  # High
-            "NOCOMM": 4,   # High
-            "REPLBATT": 3, # Normal
-            "NOPARENT": 3, # Normal
-            "ONLINE": 3,   # Normal
-            "COMMOK": 2    # Low
-        }
+        message = NTFY_MESSAGES.get(event_type, "UPS {ups_name} reports status: {event_type}\n\n{details}").format(
+            ups_name=ups_name, event_type=event_type, details=details
+        )
         
-        priority = priority_map.get(event_type, config.get('priority', 3))
+        tags = NTFY_TAGS.get(event_type, "")
+        priority = NTFY_PRIORITIES.get(event_type, config.get('priority', 3))
         
         # Create a NtfyNotifier instance using the config and send the notification
         from core.extranotifs.ntfy.ntfy import NtfyNotifier
         # Log more detailed info about the notification being sent
         server = config.get('server', 'https://ntfy.sh')
         topic = config.get('topic', '')
-        log_message(f"Sending ntfy notification to {server}/{topic} with tags: {tags}", True)
+        log_message("Sending ntfy notification to %s/%s with tags: %s", server, topic, tags, is_debug=True)
         notifier = NtfyNotifier(config)
         result = notifier.send_notification(title, message, event_type, priority)
         
@@ -1186,7 +1239,7 @@ def send_ntfy_notification(ups_name, event_type, config):
         return result
     except Exception as e:
         log_message(f"ERROR: Failed to send Ntfy notification: {str(e)}")
-        log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+        log_traceback()
         return {"success": False, "message": str(e)}
 
 def get_detailed_ups_info(ups_name):
@@ -1201,7 +1254,10 @@ def get_detailed_ups_info(ups_name):
     """
     try:
         # Add detailed logging
-        log_message(f"DEBUG: Starting get_detailed_ups_info for {ups_name}", True)
+        log_message("DEBUG: Starting get_detailed_ups_info for %s", ups_name, is_debug=True)
+        
+        # Get current date and time for the event
+        now = datetime.datetime.now(LOCAL_TZ)
         
         # Default UPS info with safe values
         ups_info = {
@@ -1219,12 +1275,9 @@ def get_detailed_ups_info(ups_name):
             'ups_firmware': 'Unknown',
             'ups_mfr': 'Unknown',
             'device_location': 'Unknown',
-            'last_update': datetime.datetime.now(app.CACHE_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+            'last_update': now.strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        # Get current date and time for the event
-        now = datetime.datetime.now(app.CACHE_TIMEZONE)
-        
         # Format date and time for the template
         ups_info['event_date'] = now.strftime('%Y-%m-%d')
         ups_info['event_time'] = now.strftime('%H:%M:%S')
@@ -1233,58 +1286,43 @@ def get_detailed_ups_info(ups_name):
         with app.app_context():
             try:
                 # Get static data using dynamic SQL through ORM
-                log_message("DEBUG: Querying static data using dynamic ORM query", True)
-                
-                # First check if tables exist
-                tables = inspect(db.engine).get_table_names()
-                log_message(f"DEBUG: Available tables in database: {tables}", True)
+                log_message("DEBUG: Querying static data using dynamic ORM query", is_debug=True)
                 
-                if 'ups_static_data' in tables:
-                    # Use pure ORM approach to get the static data
-                    from core.db.ups.models import get_static_model
-                    UPSStaticData = get_static_model(db)
-                    
-                    # Get the first record using ORM
-                    static_record = UPSStaticData.query.first()
-                    log_message(f"DEBUG: Got static data record: {static_record}", True)
+                # Static data does not change during a notifier run, read it once
+                static_data = _get_static_data()
+                if static_data:
+                    log_message("DEBUG: Static data retrieved: %s", static_data, is_debug=True)
                     
-                    if static_record:
-                        # Convert ORM object to dictionary
-                        static_data = {column.name: getattr(static_record, column.name) 
-                                      for column in static_record.__table__.columns}
-                        log_message(f"DEBUG: Static data retrieved: {static_data}", True)
-                        
-                        # Key fields we're interested in
-                        for field in ['device_model', 'device_serial', 'battery_type', 'ups_model']:
-                            if field in static_data and static_data[field] is not None:
-                                ups_info[field] = str(static_data[field])
-                                log_message(f"DEBUG: Set static value {field} = {ups_info[field]}", True)
+                    # Key fields we're interested in
+                    for field in _STATIC_INFO_FIELDS:
+                        if field in static_data and static_data[field] is not None:
+                            ups_info[field] = str(static_data[field])
+                            log_message("DEBUG: Set static value %s = %s", field, ups_info[field], is_debug=True)
                 
-                if 'ups_dynamic_data' in tables:
-                    # Use pure ORM approach to get the dynamic data
-                    from core.db.ups.models import get_ups_model
+                if 'ups_dynamic_data' in _TABLES:
+                    # Latest dynamic row in one read on the shared read-only connection,
+                    # without building an ORM object for it
                     UPSDynamicData = get_ups_model(db)
-                    
-                    # Get the most recent record using ORM
-                    dynamic_record = UPSDynamicData.query.order_by(UPSDynamicData.timestamp_utc.desc()).first()
-                    log_message(f"DEBUG: Got dynamic data record: {dynamic_record}", True)
+                    dynamic_record = _read_latest_row(
+                        UPSDynamicData, tuple(UPSDynamicData.__table__.columns.keys()), 'timestamp_utc'
+                    )
                     
                     if dynamic_record:
-                        # Convert ORM object to dictionary
-                        dynamic_data = {column.name: getattr(dynamic_record, column.name) 
-                                       for column in dynamic_record.__table__.columns}
-                        log_message(f"DEBUG: Dynamic data retrieved: {dynamic_data}", True)
+                        dynamic_columns = dynamic_record.keys()
+                        if _DEBUG:
+                            log_message("DEBUG: Dynamic data retrieved: %s", tuple(dynamic_record), is_debug=True)
                         
                         # Update ups_info with all available dynamic data
-                        for key, value in dynamic_data.items():
-                            if key not in ['id', 'timestamp_utc'] and value is not None:
+                        for key in dynamic_columns:
+                            value = dynamic_record[key]
+                            if key not in ('id', 'timestamp_utc') and value is not None:
                                 ups_info[key] = str(value)
-                                log_message(f"DEBUG: Set dynamic value {key} = {value}", True)
+                                log_message("DEBUG: Set dynamic value %s = %s", key, value, is_debug=True)
                         
                         # Store the timestamp with timezone conversion
-                        if 'timestamp_utc' in dynamic_data and dynamic_data['timestamp_utc'] is not None:
+                        if 'timestamp_utc' in dynamic_columns and dynamic_record['timestamp_utc'] is not None:
                             # Convert UTC timestamp to local timezone
-                            timestamp_utc = dynamic_data['timestamp_utc']
+                            timestamp_utc = dynamic_record['timestamp_utc']
                             if isinstance(timestamp_utc, str):
                                 try:
                                     # Try to parse ISO format string
@@ -1299,53 +1337,20 @@ def get_detailed_ups_info(ups_name):
                             
                             # Ensure timestamp is timezone aware (UTC)
                             if timestamp_utc.tzinfo is None:
-                                timestamp_utc = timestamp_utc.replace(tzinfo=pytz.UTC)
+                                timestamp_utc = timestamp_utc.replace(tzinfo=datetime.timezone.utc)
                                 
                             # Convert to local timezone
-                            local_timestamp = timestamp_utc.astimezone(app.CACHE_TIMEZONE)
+                            local_timestamp = timestamp_utc.astimezone(LOCAL_TZ)
                             ups_info['last_update'] = local_timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                            log_message(f"DEBUG: Set last_update = {ups_info['last_update']} (converted from UTC)", True)
+                            log_message("DEBUG: Set last_update = %s (converted from UTC)", ups_info['last_update'], is_debug=True)
                         else:
-                            log_message("DEBUG: No timestamp_utc found in data, using current time", True)
+                            log_message("DEBUG: No timestamp_utc found in data, using current time", is_debug=True)
             except Exception as e:
-                log_message(f"WARNING: Dynamic ORM query failed: {e}", True)
-                log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+                log_message("WARNING: Dynamic ORM query failed: %s", e, is_debug=True)
+                log_traceback()
         
-        # Ensure proper formatting of all values
-        # Make sure battery charge has % symbol
-        if 'battery_charge' in ups_info and not ups_info['battery_charge'].endswith('%'):
-            ups_info['battery_charge'] = f"{ups_info['battery_charge']}%"
-            
-        # Make sure voltage values have V suffix
-        for key in list(ups_info.keys()):
-            if 'voltage' in key and not ups_info[key].endswith('V'):
-                ups_info[key] = f"{ups_info[key]}V"
-        
-        # Make sure runtime has min suffix and is converted from seconds if needed
-        if 'battery_runtime' in ups_info and ups_info['battery_runtime'].isdigit():
-            runtime_min = int(ups_info['battery_runtime']) // 60
-            ups_info['runtime_estimate'] = f"{runtime_min} min"
-            log_message(f"DEBUG: Calculated runtime_estimate from battery_runtime: {ups_info['runtime_estimate']}", True)
-        elif 'runtime_estimate' in ups_info and not ups_info['runtime_estimate'].endswith('min'):
-            ups_info['runtime_estimate'] = f"{ups_info['runtime_estimate']} min"
-            
-        # Make sure we always have some value for runtime_estimate
-        if 'runtime_estimate' not in ups_info or ups_info['runtime_estimate'] == '0 min':
-            # Try to get it from battery_runtime_low
-            if 'battery_runtime_low' in ups_info and ups_info['battery_runtime_low'].isdigit():
-                runtime_min = int(ups_info['battery_runtime_low']) // 60
-                ups_info['runtime_estimate'] = f"{runtime_min} min"
-                log_message(f"DEBUG: Used battery_runtime_low as fallback for runtime_estimate: {ups_info['runtime_estimate']}", True)
-            # If still not available, try battery_charge and a simple estimation
-            elif 'battery_charge' in ups_info:
-                charge = ups_info['battery_charge']
-                if charge.endswith('%'):
-                    charge = charge[:-1]
-                if charge.isdigit():
-                    # Simple estimation: 1% charge = 1 minute runtime (very rough approximation)
-                    charge_value = int(charge)
-                    ups_info['runtime_estimate'] = f"{charge_value} min" 
-                    log_message(f"DEBUG: Estimated runtime from battery charge: {ups_info['runtime_estimate']}", True)
+        # Units and runtime estimate, in one pass
+        normalize_ups_info(ups_info)
         
         # Improve battery duration if it's 0 min
         if 'battery_duration' in ups_info and ups_info['battery_duration'] == '0 min':
@@ -1354,187 +1359,495 @@ def get_detailed_ups_info(ups_name):
                 uptime_min = int(ups_info['device_uptime']) // 60
                 if uptime_min > 0 and uptime_min < 60:  # If uptime is less than 60 minutes, it's likely from a restart
                     ups_info['battery_duration'] = f"{uptime_min} min"
-                    log_message(f"DEBUG: Estimated battery_duration from device_uptime in get_detailed_ups_info: {ups_info['battery_duration']}", True)
+                    log_message("DEBUG: Estimated battery_duration from device_uptime in get_detailed_ups_info: %s", ups_info['battery_duration'], is_debug=True)
         
         # Log final UPS info
-        log_message(f"DEBUG: Final UPS info: {ups_info}", True)
+        log_message("DEBUG: Final UPS info: %s", ups_info, is_debug=True)
         
         return ups_info
         
     except Exception as e:
         log_message(f"ERROR: Failed to get detailed UPS info: {e}")
-        log_message(f"TRACEBACK: {traceback.format_exc()}", True)
+        log_traceback()
+        now = datetime.datetime.now(LOCAL_TZ)
         return {
             'ups_model': 'Unknown',
             'device_serial': 'Unknown',
             'ups_status': 'Unknown',
-            'battery_charge': '0',
+            'battery_charge': '0%',
             'runtime_estimate': '0 min',
             'input_voltage': '0V',
             'battery_voltage': '0V',
             'ups_host': ups_name,
-            'last_update': datetime.datetime.now(app.CACHE_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'),
-            'event_date': datetime.datetime.now(app.CACHE_TIMEZONE).strftime('%Y-%m-%d'),
-            'event_time': datetime.datetime.now(app.CACHE_TIMEZONE).strftime('%H:%M:%S')
+            'last_update': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'event_date': now.strftime('%Y-%m-%d'),
+            'event_time': now.strftime('%H:%M:%S')
         }
 
+# Formatted details per UPS: {ups_host: (key, details)}. The key holds last_update,
+# which identifies the dynamic row, plus the per-event values that are not in it.
+_DETAILS_CACHE_FIELDS = ('last_update', 'event_date', 'event_time', 'battery_duration', 'comm_duration')
+_DETAILS_CACHE_SIZE = 32
+_details_cache = {}
+_details_cache_lock = threading.Lock()
+
 def format_ups_details(ups_info):
     """
     Format UPS information into a readable string
     
+    The result is reused while the UPS data and the event values are unchanged,
+    e.g. for every Ntfy configuration notified about the same event.
+    
     Args:
         ups_info: Dictionary of UPS information
         
     Returns:
         str: Formatted UPS details
     """
-    log_message(f"DEBUG: Formatting UPS details from: {ups_info}", True)
-    
-    # Format the battery runtime from seconds to minutes if available
-    runtime_min = '0'
-    if 'battery_runtime' in ups_info:
-        runtime_str = ups_info['battery_runtime']
-        if isinstance(runtime_str, str) and runtime_str.isdigit():
-            runtime_min = str(int(runtime_str) // 60)
-        elif 'runtime_estimate' in ups_info:
-            runtime_str = ups_info['runtime_estimate']
-            if runtime_str.endswith(' min'):
-                runtime_min = runtime_str.replace(' min', '')
-    
-    # Ensure battery charge has % symbol
-    battery_charge = ups_info.get('battery_charge', '0')
-    if not battery_charge.endswith('%'):
-        battery_charge = f"{battery_charge}%"
-    
-    # Ensure voltage values have V suffix
-    input_voltage = ups_info.get('input_voltage', '0')
-    if not input_voltage.endswith('V'):
-        input_voltage = f"{input_voltage}V"
-    
-    battery_voltage = ups_info.get('battery_voltage', '0')
-    if not battery_voltage.endswith('V'):
-        battery_voltage = f"{battery_voltage}V"
-        
-    output_voltage = ups_info.get('output_voltage', '0')
-    if not output_voltage.endswith('V') and output_voltage != '0':
-        output_voltage = f"{output_voltage}V"
-        
-    battery_voltage_nominal = ups_info.get('battery_voltage_nominal', '0')
-    if not battery_voltage_nominal.endswith('V') and battery_voltage_nominal != '0':
-        battery_voltage_nominal = f"{battery_voltage_nominal}V"
-    
-    # Format UPS load if available
-    ups_load = ups_info.get('ups_load', '')
-    if ups_load and not ups_load.endswith('%'):
-        ups_load = f"{ups_load}%"
-        
-    # Format battery durations and make sure they're never 0 min if we can help it
-    battery_duration = ups_info.get('battery_duration', '0 min')
-    if not battery_duration.endswith('min'):
-        battery_duration = f"{battery_duration} min"
-    
-    # Improve runtime estimate if it's 0 min
-    runtime_estimate = ups_info.get('runtime_estimate', '0 min')
-    if runtime_estimate == '0 min' and battery_charge != '0%':
-        # Try to calculate from battery charge
-        charge = battery_charge
-        if charge.endswith('%'):
-            charge = charge[:-1]
-        if charge.isdigit():
-            charge_value = int(charge)
-            if charge_value > 0:
-                # Simple estimation: 1% charge = 1 minute runtime (very rough approximation)
-                runtime_estimate = f"{charge_value} min"
-                log_message(f"DEBUG: Estimated runtime from battery charge in format_ups_details: {runtime_estimate}", True)
+    ups_host = ups_info.get('ups_host')
+    cache_key = tuple(ups_info.get(field) for field in _DETAILS_CACHE_FIELDS)
+    with _details_cache_lock:
+        cached = _details_cache.get(ups_host)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    
+    log_message("DEBUG: Formatting UPS details from: %s", ups_info, is_debug=True)
+    
+    g = ups_info.get
+    
+    # Values arrive with their units from get_detailed_ups_info
+    battery_charge = g('battery_charge', '0%')
+    battery_voltage = g('battery_voltage', '0V')
+    battery_voltage_nominal = g('battery_voltage_nominal', '0V')
+    battery_duration = g('battery_duration', '0 min')
+    runtime_estimate = g('runtime_estimate', '0 min')
     
     # Improve battery duration if it's 0 min
-    if battery_duration == '0 min' and 'device_uptime' in ups_info and ups_info['device_uptime'].isdigit():
+    device_uptime = g('device_uptime')
+    if battery_duration == '0 min' and device_uptime is not None and device_uptime.isdigit():
         # Use device uptime as a fallback (likely restart after power off)
-        uptime_min = int(ups_info['device_uptime']) // 60
+        uptime_min = int(device_uptime) // 60
         if uptime_min > 0 and uptime_min < 60:  # If uptime is less than 60 minutes, it's likely from a restart
             battery_duration = f"{uptime_min} min"
-            log_message(f"DEBUG: Estimated battery_duration from device_uptime in format_ups_details: {battery_duration}", True)
+            log_message("DEBUG: Estimated battery_duration from device_uptime in format_ups_details: %s", battery_duration, is_debug=True)
     
-    # Create a detailed status report
-    details = []
+    # Build the report in one buffer; sections are separated by a blank line
+    out = []
+    add = out.append
     
     # Device information section
-    device_model = ups_info.get('device_model') or ups_info.get('ups_model') or 'Unknown'
-    device_serial = ups_info.get('device_serial') or ups_info.get('ups_serial') or 'Unknown'
-    device_location = ups_info.get('device_location', '')
+    add(f"📱 DEVICE INFO:\n  Model: {g('device_model') or g('ups_model') or 'Unknown'}"
+        f"\n  Serial: {g('device_serial') or g('ups_serial') or 'Unknown'}")
+    device_location = g('device_location', '')
+    if device_location:
+        add(f"\n  Location: {device_location}")
+    ups_firmware = g('ups_firmware')
+    if ups_firmware:
+        add(f"\n  Firmware: {ups_firmware}")
+    ups_mfr = g('ups_mfr')
+    if ups_mfr:
+        add(f"\n  Manufacturer: {ups_mfr}")
     
-    device_section = [
-        f"📱 DEVICE INFO:",
-        f"  Model: {device_model}",
-        f"  Serial: {device_serial}"
-    ]
+    # Battery information section
+    add(f"\n\n🔋 BATTERY INFO:\n  Charge: {battery_charge}")
+    if runtime_estimate and runtime_estimate != '0 min':
+        add(f"\n  Est. Runtime: {runtime_estimate}")
+    if battery_voltage != '0V':
+        add(f"\n  Battery Voltage: {battery_voltage}")
+    if battery_voltage_nominal != '0V':
+        add(f"\n  Nominal Voltage: {battery_voltage_nominal}")
+    temp = g('battery_temperature')
+    if temp is not None and temp != '0':
+        add(f"\n  Temperature: {temp}" if temp.endswith('°C') else f"\n  Temperature: {temp}°C")
+    if battery_duration != '0 min':
+        add(f"\n  Battery Duration: {battery_duration}")
     
-    if device_location:
-        device_section.append(f"  Location: {device_location}")
-    if ups_info.get('ups_firmware'):
-        device_section.append(f"  Firmware: {ups_info.get('ups_firmware')}")
-    if ups_info.get('ups_mfr'):
-        device_section.append(f"  Manufacturer: {ups_info.get('ups_mfr')}")
+    # Event information section if we have date and time
+    event_date = g('event_date')
+    event_time = g('event_time')
+    if event_date and event_time:
+        add(f"\n\n📅 EVENT INFO:\n  Date: {event_date}\n  Time: {event_time}")
+    
+    # Last update timestamp
+    add(f"\n\n\n⏰ Last update: {g('last_update')}")
+    
+    formatted_details = "".join(out)
+    log_message("DEBUG: Formatted UPS details: %s", formatted_details, is_debug=True)
+    
+    with _details_cache_lock:
+        if ups_host not in _details_cache and len(_details_cache) >= _DETAILS_CACHE_SIZE:
+            # Drop the oldest entry
+            _details_cache.pop(next(iter(_details_cache)))
+        _details_cache[ups_host] = (cache_key, formatted_details)
+    
+    return formatted_details
+
+def get_enabled_webhook_configs(event_type):
+    """
+    Check which webhook configurations are enabled for this event type
+    
+    Args:
+        event_type (str): Type of event (ONLINE, ONBATT, etc.)
         
-    details.append("\n".join(device_section))
+    Returns:
+        list: List of webhook configurations
+    """
+    if not HAS_WEBHOOK:
+        log_message("Webhook module not available, skipping webhook notifications", is_debug=True)
+        return []
     
-    # Power information section
-    power_section = [
-        f"⚡ POWER INFO:",
-        f"  Status: {ups_info.get('ups_status', 'Unknown')}"
-    ]
+    try:
+        from core.extranotifs.webhook.db import get_enabled_configs_for_event
+        configs = get_enabled_configs_for_event(event_type)
+        
+        if not configs and event_type in ['COMMBAD', 'COMMOK', 'NOCOMM']:
+            logger.warning(f"No enabled webhook configurations found for {event_type}. Check notification settings for webhook.")
+        return configs
+    except Exception as e:
+        logger.error(f"Error checking enabled webhook configs: {str(e)}")
+        return []
+
+def send_email_notifications(ups_name, event_type, notifications):
+    """
+    Send all enabled email notifications for an event
     
-    if input_voltage != '0V':
-        power_section.append(f"  Input Voltage: {input_voltage}")
+    Args:
+        ups_name: Name of the UPS
+        event_type: Type of event
+        notifications: Enabled email notifications from get_enabled_notifications
+    """
+    # Verify email configuration before sending notifications
+    if not verify_email_config():
+        logger.info("Email notifications disabled - no valid email configuration")
+        return
     
-    if output_voltage != '0V':
-        power_section.append(f"  Output Voltage: {output_voltage}")
+    # Several settings rows can point at the same mail configuration; each
+    # configuration gets one message (and one msmtp run) per event
+    sent_config_ids = set()
+    for notification in notifications:
+        if notification.get('type') != 'email':
+            continue
+        if notification['config_id'] in sent_config_ids:
+            log_message("DEBUG: Email config %s already notified for %s", notification['config_id'], event_type, is_debug=True)
+            continue
+        sent_config_ids.add(notification['config_id'])
+        send_email_notification(ups_name, event_type, notification)
+
+class CircuitBreaker:
+    """
+    Stop calling an endpoint that keeps failing: CLOSED -> OPEN -> HALF_OPEN
     
-    if ups_load:
-        power_section.append(f"  UPS Load: {ups_load}")
+    After failure_threshold consecutive failures the circuit opens and calls are
+    refused for recovery_timeout seconds. Then a single probe call is allowed:
+    success closes the circuit again, failure re-opens it.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
     
-    # Battery information section
-    battery_section = [
-        f"🔋 BATTERY INFO:",
-        f"  Charge: {battery_charge}"
-    ]
+    def __init__(self, failure_threshold=5, recovery_timeout=60, state=CLOSED, failures=0, opened_at=0.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        # A probe interrupted by the end of a previous run counts as still open;
+        # its timeout has passed, so the next allow() probes again
+        self.state = self.OPEN if state == self.HALF_OPEN else state
+        self.failures = failures
+        self.opened_at = opened_at
+        # Outcomes recorded by this run, merged into the saved state by save_breakers
+        self.run_failures = 0
+        self.run_succeeded = False
+        self._lock = threading.Lock()
     
-    if runtime_estimate and runtime_estimate != '0 min':
-        battery_section.append(f"  Est. Runtime: {runtime_estimate}")
+    def allow(self):
+        """
+        Check whether a call may go through now
+        
+        Returns:
+            bool: False while the circuit is open or a probe is already in flight
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
     
-    if battery_voltage != '0V':
-        battery_section.append(f"  Battery Voltage: {battery_voltage}")
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.run_failures = 0
+            self.run_succeeded = True
     
-    if battery_voltage_nominal != '0V':
-        battery_section.append(f"  Nominal Voltage: {battery_voltage_nominal}")
+    def record_failure(self):
+        """Count a failed call, opening the circuit at the threshold or on a failed probe"""
+        with self._lock:
+            self.failures += 1
+            self.run_failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
     
-    if 'battery_temperature' in ups_info and ups_info['battery_temperature'] != '0':
-        temp = ups_info['battery_temperature']
-        if not temp.endswith('°C'):
-            temp = f"{temp}°C"
-        battery_section.append(f"  Temperature: {temp}")
+    def merge(self, saved):
+        """
+        Apply this run's outcomes on top of the state saved by other runs
         
-    if battery_duration != '0 min':
-        battery_section.append(f"  Battery Duration: {battery_duration}")
+        Other notifier processes may have saved newer failures for the same
+        endpoint since this run loaded it; those are kept rather than overwritten.
+        
+        Args:
+            saved (dict): State currently in CIRCUIT_STATE_FILE, or None
+            
+        Returns:
+            dict: State to save, or None if this run did not call the endpoint
+        """
+        with self._lock:
+            if not self.run_failures:
+                if not self.run_succeeded:
+                    return None
+                # The last call went through: the endpoint is healthy again
+                return {'state': self.CLOSED, 'failures': 0, 'opened_at': 0.0}
+            
+            saved = saved or {}
+            saved_open = saved.get('state', self.CLOSED) != self.CLOSED
+            # A success in this run resets the count before our latest failures
+            failures = self.run_failures + (0 if self.run_succeeded else saved.get('failures', 0))
+            if self.state == self.OPEN:
+                return {'state': self.OPEN, 'failures': failures, 'opened_at': self.opened_at}
+            if saved_open and not self.run_succeeded:
+                return {'state': self.OPEN, 'failures': failures, 'opened_at': saved.get('opened_at', 0.0)}
+            if failures >= self.failure_threshold:
+                return {'state': self.OPEN, 'failures': failures, 'opened_at': time.time()}
+            return {'state': self.CLOSED, 'failures': failures, 'opened_at': 0.0}
+
+_breakers = None
+_breakers_lock = threading.Lock()
+
+def get_breaker(key):
+    """
+    Get the circuit breaker for an endpoint
+    
+    Args:
+        key (str): Endpoint identifier, e.g. "ntfy:<server>/<topic>" or "webhook:<url>"
+        
+    Returns:
+        CircuitBreaker: Breaker restored from CIRCUIT_STATE_FILE, or a closed one
+    """
+    global _breakers
+    with _breakers_lock:
+        if _breakers is None:
+            _breakers = {}
+            try:
+                with open(CIRCUIT_STATE_FILE) as state_file:
+                    # save_breakers rewrites the file in place under an exclusive lock
+                    fcntl.flock(state_file, fcntl.LOCK_SH)
+                    for saved_key, saved in json.loads(state_file.read() or '{}').items():
+                        _breakers[saved_key] = CircuitBreaker(**saved)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                log_message("WARNING: Ignoring unreadable circuit state: %s", e, is_debug=True)
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker()
+        return _breakers[key]
+
+def save_breakers():
+    """
+    Merge this run's circuit breaker outcomes into CIRCUIT_STATE_FILE
     
-    details.append("\n".join(battery_section))
+    Notifier processes can run at the same time, so the file is re-read under
+    an exclusive lock and only the endpoints this run called are updated.
+    """
+    with _breakers_lock:
+        if not _breakers:
+            return
+        breakers = dict(_breakers)
+    try:
+        with open(CIRCUIT_STATE_FILE, 'a+') as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            state_file.seek(0)
+            try:
+                states = json.loads(state_file.read() or '{}')
+            except ValueError:
+                states = {}
+            
+            for key, breaker in breakers.items():
+                merged = breaker.merge(states.get(key))
+                if merged is not None:
+                    states[key] = merged
+            
+            # Closed circuits with no failures are the default, no need to keep them
+            states = {key: state for key, state in states.items()
+                      if state['state'] != CircuitBreaker.CLOSED or state['failures']}
+            state_file.seek(0)
+            state_file.truncate()
+            json.dump(states, state_file)
+    except Exception as e:
+        log_message("WARNING: Could not save circuit state: %s", e, is_debug=True)
+
+# An event is not notified again when it repeats the last event notified for
+# the same UPS within this window (e.g. a burst of COMMBAD from a flaky link)
+COALESCE_WINDOW = 3  # seconds
+# Events that are always notified, however often they repeat
+COALESCE_EXEMPT = frozenset({'LOWBATT', 'FSD', 'SHUTDOWN'})
+
+def claim_notification(ups_name, event_type):
+    """
+    Decide whether this event should be notified or folded into a recent one
     
-    # Event information section if we have date and time
-    if ups_info.get('event_date') and ups_info.get('event_time'):
-        event_section = [
-            f"📅 EVENT INFO:",
-            f"  Date: {ups_info.get('event_date')}",
-            f"  Time: {ups_info.get('event_time')}"
-        ]
-        details.append("\n".join(event_section))
+    Only a repeat of the last event notified for the UPS is folded, so a
+    state change (ONBATT -> ONLINE -> ONBATT) is always notified and the
+    user is never left with a stale state. upsmon starts one notifier per
+    event, possibly several at once, so the last notified event per UPS is
+    kept in RECENT_EVENTS_FILE under an exclusive lock.
     
-    # Last update timestamp
-    details.append(f"\n⏰ Last update: {ups_info.get('last_update')}")
+    Args:
+        ups_name: Name of the UPS
+        event_type: Type of event
+        
+    Returns:
+        bool: True to send notifications, False if the same event was the last
+            one notified for this UPS, less than COALESCE_WINDOW seconds ago
+    """
+    now = time.time()
+    try:
+        with open(RECENT_EVENTS_FILE, 'a+') as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            state_file.seek(0)
+            try:
+                recent = json.loads(state_file.read() or '{}')
+            except ValueError:
+                recent = {}
+            
+            # {ups_name: [event_type, notified_at]}
+            last = recent.get(ups_name)
+            is_repeat = (
+                isinstance(last, list) and len(last) == 2
+                and last[0] == event_type and now - last[1] < COALESCE_WINDOW
+            )
+            claimed = event_type in COALESCE_EXEMPT or not is_repeat
+            if claimed:
+                recent[ups_name] = [event_type, now]
+            
+            # Entries older than the window no longer matter
+            recent = {
+                name: entry for name, entry in recent.items()
+                if isinstance(entry, list) and len(entry) == 2 and now - entry[1] < COALESCE_WINDOW
+            }
+            state_file.seek(0)
+            state_file.truncate()
+            json.dump(recent, state_file)
+        return claimed
+    except Exception as e:
+        # Never lose a notification because the state file is unusable
+        log_message("WARNING: Could not check recent events: %s", e, is_debug=True)
+        return True
+
+# Upper bound on concurrent Ntfy POSTs for one event
+NTFY_MAX_WORKERS = 4
+
+def send_ntfy_notifications(ups_name, event_type, ntfy_configs, snapshot=None):
+    """
+    Send an Ntfy notification for an event to every enabled configuration
     
-    formatted_details = "\n\n".join(details)
-    log_message(f"DEBUG: Formatted UPS details: {formatted_details}", True)
+    Args:
+        ups_name: Name of the UPS
+        event_type: Type of event
+        ntfy_configs: Enabled configurations from get_enabled_ntfy_configs
+        snapshot: Result of get_detailed_ups_info shared by all channels
+    """
+    logger.info(f"Processing {len(ntfy_configs)} Ntfy configurations for {event_type}")
     
-    return formatted_details
+    # Build the message data once; read-only so no configuration can alter it for the next
+    ups_info = MappingProxyType(prepare_ntfy_ups_info(ups_name, event_type, snapshot))
+    
+    # Each POST waits on its own server: send to all configurations at once so the
+    # slowest one, not the sum of them, bounds the delivery time
+    with ThreadPoolExecutor(max_workers=min(len(ntfy_configs), NTFY_MAX_WORKERS)) as executor:
+        futures = []
+        for i, config in enumerate(ntfy_configs):
+            breaker = get_breaker(f"ntfy:{config.get('server')}/{config.get('topic')}")
+            if not breaker.allow():
+                logger.warning(f"Skipping Ntfy server {config.get('server')} (ID: {config.get('id')}): circuit open after repeated failures")
+                continue
+            logger.info(f"Sending Ntfy notification {i+1}/{len(ntfy_configs)} to server: {config.get('server')} (ID: {config.get('id')})")
+            futures.append((config, breaker, executor.submit(
+                _run_in_app_context, send_ntfy_notification, ups_name, event_type, config, ups_info
+            )))
+        
+        for config, breaker, future in futures:
+            result = future.result() or {}
+            if result.get('success', False):
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+                logger.warning(f"Failed to send Ntfy notification to {config.get('server')}: {result.get('message', 'Unknown error')}")
+
+def send_webhook_notifications(ups_name, event_type, webhook_configs, snapshot=None):
+    """
+    Send webhook notifications for an event
+    
+    Args:
+        ups_name: Name of the UPS
+        event_type: Type of event
+        webhook_configs: Enabled configurations from get_enabled_webhook_configs
+        snapshot: Result of get_detailed_ups_info shared by all channels
+    """
+    try:
+        logger.info(f"Sending webhook notifications for {event_type}")
+        
+        # Special handling for UPS communication events to ensure notifications are sent
+        if event_type in ['COMMBAD', 'COMMOK', 'NOCOMM']:
+            logger.info(f"⚠️ UPS communication event detected: {event_type} - Ensuring notification is sent")
+            logger.info(f"Found {len(webhook_configs)} webhook configurations for {event_type}")
+        
+        # Leave out webhooks whose circuit is open
+        breakers = {}
+        webhooks = []
+        for webhook_config in webhook_configs:
+            breaker = get_breaker(f"webhook:{webhook_config.get('url')}")
+            if breaker.allow():
+                breakers[webhook_config.get('id')] = breaker
+                webhooks.append(webhook_config)
+            else:
+                logger.warning(f"Skipping webhook {webhook_config.get('name')} (ID: {webhook_config.get('id')}): circuit open after repeated failures")
+        if not webhooks:
+            return
+        
+        from core.extranotifs.webhook.webhook import send_event_notification as send_webhook_notification
+        # Hand over a plain copy: the payload is serialized as JSON
+        ups_info = dict(snapshot) if snapshot is not None else None
+        result = send_webhook_notification(event_type, ups_name, webhooks, ups_info=ups_info)
+        for webhook_result in result.get('results', []):
+            breaker = breakers.get(webhook_result.get('webhook_id'))
+            if breaker and webhook_result.get('success'):
+                breaker.record_success()
+            elif breaker:
+                breaker.record_failure()
+        
+        if result.get('success'):
+            logger.info(f"Webhook notifications sent: {result.get('message')}")
+        else:
+            logger.warning(f"Webhook notifications failed or none configured: {result.get('message')}")
+            
+            # Additional error details for debugging
+            if 'error_type' in result:
+                logger.warning(f"Webhook error type: {result.get('error_type')}")
+            if 'response' in result:
+                logger.warning(f"Webhook response: {result.get('response')}")
+    except Exception as e:
+        logger.error(f"Error sending webhook notifications: {str(e)}")
+        logger.error(f"Traceback for webhook error: {traceback.format_exc()}")
+
+def _run_in_app_context(func, *args):
+    """Run func in its own app context, as required by worker threads"""
+    with app.app_context():
+        return func(*args)
+
+# Seconds after which process_ups_event reports channels that have not finished
+NOTIFY_DEADLINE = 15
 
 def process_ups_event(ups_name, event_type):
     """Process a UPS event and send notifications"""
@@ -1548,72 +1861,84 @@ def process_ups_event(ups_name, event_type):
         notifications = get_enabled_notifications(event_type)
         
         # Get enabled ntfy configurations
-        ntfy_configs = get_enabled_ntfy_configs(event_type)
+        ntfy_configs = get_enabled_ntfy_configs(event_type) if HAS_NTFY else []
+        
+        # Get enabled webhook configurations
+        webhook_configs = get_enabled_webhook_configs(event_type)
             
-        # Check if we have any notifications to send
-        if not notifications and not ntfy_configs and not HAS_WEBHOOK:
+        # Check if we have any notifications to send; the event is already stored,
+        # so skip UPS info gathering and all delivery work when nothing is enabled
+        if not notifications and not ntfy_configs and not webhook_configs:
             logger.info(f"No enabled notifications found for {event_type}")
             return True
-            
-        # Send email notifications if there are any enabled
+        
+        # The event is stored either way; only the notifications are coalesced
+        if not claim_notification(ups_name, event_type):
+            logger.info(f"{event_type} for {ups_name} was already notified in the last {COALESCE_WINDOW}s, skipping")
+            return True
+        
+        # Ntfy and webhooks report the same detailed UPS snapshot: read it once here
+        # and pass it to both. The webhook module must not read it itself: run as a
+        # script, this module is __main__, and importing it again would re-run the
+        # whole app setup.
+        snapshot = None
+        if ntfy_configs or webhook_configs:
+            snapshot = MappingProxyType(get_detailed_ups_info(ups_name))
+        
+        deliveries = []
         if notifications:
-            # Verify email configuration before sending notifications
-            if not verify_email_config():
-                logger.info("Email notifications disabled - no valid email configuration")
-            else:
-                # Send notifications
-                for notification in notifications:
-                    if notification.get('type') == 'email':
-                        send_email_notification(ups_name, event_type, notification)
-        
-        # Send ntfy notifications if there are any enabled
-        if ntfy_configs and HAS_NTFY:
-            logger.info(f"Processing {len(ntfy_configs)} Ntfy configurations for {event_type}")
-            for i, config in enumerate(ntfy_configs):
-                logger.info(f"Sending Ntfy notification {i+1}/{len(ntfy_configs)} to server: {config.get('server')} (ID: {config.get('id')})")
-                result = send_ntfy_notification(ups_name, event_type, config)
-                if not result.get('success', False):
-                    logger.warning(f"Failed to send Ntfy notification to {config.get('server')}: {result.get('message', 'Unknown error')}")
-                
-        # Send webhook notifications if available
-        if HAS_WEBHOOK:
-            try:
-                logger.info(f"Sending webhook notifications for {event_type}")
-                
-                # Special handling for UPS communication events to ensure notifications are sent
-                if event_type in ['COMMBAD', 'COMMOK', 'NOCOMM']:
-                    logger.info(f"⚠️ UPS communication event detected: {event_type} - Ensuring notification is sent")
-                    # Force a more detailed log for debugging
-                    try:
-                        from core.extranotifs.webhook.db import get_enabled_configs_for_event
-                        enabled_configs = get_enabled_configs_for_event(event_type)
-                        
-                        if enabled_configs:
-                            logger.info(f"Found {len(enabled_configs)} webhook configurations for {event_type}")
-                        else:
-                            logger.warning(f"No enabled webhook configurations found for {event_type}. Check notification settings for webhook.")
-                    except Exception as config_err:
-                        logger.error(f"Error checking enabled webhook configs: {str(config_err)}")
-                
-                result = send_webhook_notification(event_type, ups_name)
-                if result.get('success'):
-                    logger.info(f"Webhook notifications sent: {result.get('message')}")
-                else:
-                    logger.warning(f"Webhook notifications failed or none configured: {result.get('message')}")
-                    
-                    # Additional error details for debugging
-                    if 'error_type' in result:
-                        logger.warning(f"Webhook error type: {result.get('error_type')}")
-                    if 'response' in result:
-                        logger.warning(f"Webhook response: {result.get('response')}")
-            except Exception as e:
-                logger.error(f"Error sending webhook notifications: {str(e)}")
-                logger.error(f"Traceback for webhook error: {traceback.format_exc()}")
-                
+            deliveries.append((send_email_notifications, (notifications,)))
+        if ntfy_configs:
+            deliveries.append((send_ntfy_notifications, (ntfy_configs, snapshot)))
+        if webhook_configs:
+            deliveries.append((send_webhook_notifications, (webhook_configs, snapshot)))
+        
+        # Email (msmtp), ntfy and webhooks each wait on the network: run the
+        # channels side by side so the slowest one bounds the notifier's runtime
+        with ThreadPoolExecutor(max_workers=len(deliveries), thread_name_prefix="ups-notify") as executor:
+            futures = {
+                executor.submit(_run_in_app_context, send, ups_name, event_type, *args): send.__name__
+                for send, args in deliveries
+            }
+            done, not_done = wait(futures, timeout=NOTIFY_DEADLINE)
+            for future in done:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error delivering notifications: {str(e)}")
+            # Deliveries already in flight are still allowed to finish
+            for future in not_done:
+                logger.warning(f"{futures[future]} still running after {NOTIFY_DEADLINE}s for {event_type}")
+        
         return True
     except Exception as e:
         logger.error(f"Failed to process event: {str(e)}")
         return False
+    finally:
+        # Keep the outcomes of whatever was sent, even if the event failed midway
+        save_breakers()
+
+# Log line per event type, formatted with the UPS name
+EVENT_LOG_MESSAGES = {
+    "ONLINE": "UPS '{ups_name}' is ONLINE - Power has been restored",
+    "ONBATT": "UPS '{ups_name}' is ON BATTERY - Power failure detected",
+    "LOWBATT": "WARNING: UPS '{ups_name}' has LOW BATTERY - Critical power level",
+    "FSD": "CRITICAL: UPS '{ups_name}' - Forced shutdown in progress",
+    "COMMOK": "UPS '{ups_name}' - Communication restored",
+    "COMMBAD": "WARNING: UPS '{ups_name}' - Communication lost",
+    "SHUTDOWN": "CRITICAL: UPS '{ups_name}' - System shutdown in progress",
+    "REPLBATT": "WARNING: UPS '{ups_name}' - Battery needs replacing",
+    "NOCOMM": "WARNING: UPS '{ups_name}' - No communication for extended period",
+    "NOPARENT": "WARNING: UPS '{ups_name}' - Parent process died",
+    "CAL": "UPS '{ups_name}' - Calibration in progress",
+    "TRIM": "UPS '{ups_name}' - Trimming incoming voltage",
+    "BOOST": "UPS '{ups_name}' - Boosting incoming voltage",
+    "OFF": "UPS '{ups_name}' - UPS is switched off",
+    "OVERLOAD": "WARNING: UPS '{ups_name}' - UPS is overloaded",
+    "BYPASS": "UPS '{ups_name}' - UPS is in bypass mode",
+    "NOBATT": "WARNING: UPS '{ups_name}' - UPS has no battery",
+    "DATAOLD": "WARNING: UPS '{ups_name}' - UPS data is too old"
+}
 
 def main():
     """Main entry point for the script"""
@@ -1643,31 +1968,13 @@ def main():
         log_message(f"Parsed UPS_NAME={ups_name}, EVENT_TYPE={event_type}")
         
         # Log the event based on its type
-        event_messages = {
-            "ONLINE": f"UPS '{ups_name}' is ONLINE - Power has been restored",
-            "ONBATT": f"UPS '{ups_name}' is ON BATTERY - Power failure detected",
-            "LOWBATT": f"WARNING: UPS '{ups_name}' has LOW BATTERY - Critical power level",
-            "FSD": f"CRITICAL: UPS '{ups_name}' - Forced shutdown in progress",
-            "COMMOK": f"UPS '{ups_name}' - Communication restored",
-            "COMMBAD": f"WARNING: UPS '{ups_name}' - Communication lost",
-            "SHUTDOWN": f"CRITICAL: UPS '{ups_name}' - System shutdown in progress",
-            "REPLBATT": f"WARNING: UPS '{ups_name}' - Battery needs replacing",
-            "NOCOMM": f"WARNING: UPS '{ups_name}' - No communication for extended period",
-            "NOPARENT": f"WARNING: UPS '{ups_name}' - Parent process died",
-            "CAL": f"UPS '{ups_name}' - Calibration in progress",
-            "TRIM": f"UPS '{ups_name}' - Trimming incoming voltage",
-            "BOOST": f"UPS '{ups_name}' - Boosting incoming voltage",
-            "OFF": f"UPS '{ups_name}' - UPS is switched off",
-            "OVERLOAD": f"WARNING: UPS '{ups_name}' - UPS is overloaded",
-            "BYPASS": f"UPS '{ups_name}' - UPS is in bypass mode",
-            "NOBATT": f"WARNING: UPS '{ups_name}' - UPS has no battery",
-            "DATAOLD": f"WARNING: UPS '{ups_name}' - UPS data is too old"
-        }
-        
-        log_message(event_messages.get(event_type, f"UPS '{ups_name}' status: {event_type}"))
+        log_message(EVENT_LOG_MESSAGES.get(event_type, "UPS '{ups_name}' status: {event_type}").format(
+            ups_name=ups_name, event_type=event_type
+        ))
         
         # Process the event within app context
         with app.app_context():
+            prime_open_events()
             if process_ups_event(ups_name, event_type):
                 log_message("Notification processing complete")
                 sys.exit(0)
@@ -1677,7 +1984,8 @@ def main():
             
     except Exception as e:
         log_message(f"CRITICAL ERROR: {str(e)}")
-        traceback.print_exc(file=open(DEBUG_LOG, 'a'))
+        with open(DEBUG_LOG, 'a') as debug_file:
+            traceback.print_exc(file=debug_file)
         sys.exit(1)
 
 if __name__ == "__main__":
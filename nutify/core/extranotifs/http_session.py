@@ -0,0 +1,42 @@
+"""
+Shared HTTP session for the notification channels.
+
+All outgoing notification requests go through one keep-alive session, so
+bursts of notifications to the same host (ntfy and webhooks often sit on
+the same self-hosted server) reuse the TCP/TLS connection instead of
+handshaking every time.
+"""
+
+import atexit
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = 10  # hosts kept in the pool
+POOL_MAXSIZE = 16  # connections kept per host
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Return the shared requests.Session, creating it on first use
+
+    The adapters never retry on their own; callers decide how to retry.
+
+    Returns:
+        requests.Session: The process-wide session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                # Pooled sockets live as long as the process; close them on exit
+                atexit.register(session.close)
+                _session = session
+    return _session
@@ -1,11 +1,67 @@
 import requests
 import json
 import logging
+import random
+import time
+from urllib3.exceptions import NewConnectionError
 from flask import current_app
+from core.extranotifs.http_session import get_session
 
 logger = logging.getLogger(__name__)
 
+# Ntfy tags per event type
+EVENT_TAGS = {
+    "ONLINE": "white_check_mark",
+    "ONBATT": "battery",
+    "LOWBATT": "warning,battery",
+    "COMMOK": "signal_strength",
+    "COMMBAD": "no_mobile_phones",
+    "SHUTDOWN": "sos,warning",
+    "REPLBATT": "wrench,battery",
+    "NOCOMM": "no_entry,warning",
+    "NOPARENT": "ghost"
+}
+
+# Notification titles per event type, prefixed with the server name when sent
+EVENT_TITLES = {
+    "ONLINE": "UPS Online",
+    "ONBATT": "UPS On Battery",
+    "LOWBATT": "UPS Low Battery",
+    "COMMOK": "UPS Communication Restored",
+    "COMMBAD": "UPS Communication Lost",
+    "SHUTDOWN": "System Shutdown Imminent",
+    "REPLBATT": "UPS Battery Replacement Needed",
+    "NOCOMM": "UPS Not Reachable",
+    "NOPARENT": "Parent Process Lost"
+}
+
+# Test notification messages per event type
+TEST_MESSAGES = {
+    "ONLINE": "Your UPS is now running on line power",
+    "ONBATT": "Your UPS has switched to battery power",
+    "LOWBATT": "Warning: UPS battery is running low",
+    "COMMOK": "Communication with UPS has been restored",
+    "COMMBAD": "Communication with UPS has been lost",
+    "SHUTDOWN": "System shutdown is imminent due to low battery",
+    "REPLBATT": "UPS battery needs replacement",
+    "NOCOMM": "Cannot communicate with the UPS",
+    "NOPARENT": "Parent process has been lost"
+}
+
 class NtfyNotifier:
+    # Transient failures are retried with full-jitter exponential backoff
+    MAX_ATTEMPTS = 4
+    RETRY_BASE = 1  # seconds
+    RETRY_CAP = 30  # seconds
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    # Total time one send may spend on attempts and waits; matches the
+    # notifier's delivery deadline and keeps test requests from the UI short
+    RETRY_BUDGET = 15  # seconds
+    
+    # Separate connect and read budgets, so an unreachable server fails fast
+    CONNECT_TIMEOUT = 3.05  # seconds, just above a TCP retransmit window
+    READ_TIMEOUT = 7  # seconds
+    
     def __init__(self, config):
         self.config = config
         self.server = config.get('server', 'https://ntfy.sh')
@@ -16,6 +72,17 @@ class NtfyNotifier:
         self.priority = config.get('priority', 3)
         self.use_tags = config.get('use_tags', True)
         self.server_name = config.get('server_name', '')
+        
+        # None of these change after construction, so work them out once
+        self._url = f"{self.server.rstrip('/')}/{self.topic}"
+        self._priority = str(self.priority)
+        self._timeout = (
+            config.get('connect_timeout', self.CONNECT_TIMEOUT),
+            config.get('read_timeout', self.READ_TIMEOUT)
+        )
+        self._auth = None
+        if self.use_auth and self.username and self.password and self.password != '********':
+            self._auth = (self.username, self.password)
     
     def send_notification(self, title, message, event_type=None, priority=None):
         """
@@ -34,7 +101,7 @@ class NtfyNotifier:
             # Prepare headers
             headers = {
                 "Title": title,
-                "Priority": str(priority if priority is not None else self.priority)
+                "Priority": self._priority if priority is None else str(priority)
             }
             
             # Add tags based on event type if enabled
@@ -47,9 +114,9 @@ class NtfyNotifier:
             if self.server_name and not message.startswith(f"[{self.server_name}]"):
                 message = f"[{self.server_name}] {message}"
             
-            # Prepare auth
-            auth = None
-            if self.use_auth and self.username and self.password:
+            # Prepare auth; a masked password is resolved once and then reused
+            auth = self._auth
+            if auth is None and self.use_auth and self.username and self.password:
                 # If the password is asterisks, we need to get the real password from the database
                 if self.password == '********':
                     # Get the real password from the database
@@ -66,20 +133,17 @@ class NtfyNotifier:
                 
                 # Set auth tuple with username and password
                 auth = (self.username, self.password)
+                if self.password != '********':
+                    self._auth = auth
             
-            # Send notification
-            url = f"{self.server}/{self.topic}"
-            logger.debug(f"Sending ntfy notification to {url} with auth: {bool(auth)}")
+            # Send notification; encode the body once, explicitly as UTF-8 (messages carry emoji)
+            url = self._url
+            body = message.encode('utf-8')
+            logger.debug("Sending ntfy notification to %s with auth: %s", url, bool(auth))
             
-            response = requests.post(
-                url,
-                data=message,
-                headers=headers,
-                auth=auth,
-                timeout=10
-            )
+            response = self._post_with_retry(url, body, headers, auth, event_type)
             
-            if response.status_code in [200, 201, 202]:
+            if 200 <= response.status_code < 300:
                 logger.info(f"Ntfy notification sent successfully to {self.topic}")
                 return {"success": True, "message": "Notification sent successfully"}
             else:
@@ -90,20 +154,92 @@ class NtfyNotifier:
             logger.error(f"Error sending Ntfy notification: {str(e)}")
             return {"success": False, "message": str(e)}
     
+    def _retry_delay(self, attempt, retry_after=None):
+        """
+        Seconds to wait before the next attempt
+        
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed
+            retry_after (str, optional): Retry-After header sent by the server
+        
+        Returns:
+            float: The server's Retry-After (in seconds) if given, else a random
+                delay between 0 and min(RETRY_CAP, RETRY_BASE * 2**attempt)
+        """
+        if retry_after and retry_after.isdigit():
+            return min(self.RETRY_CAP, int(retry_after))
+        return random.uniform(0, min(self.RETRY_CAP, self.RETRY_BASE * 2 ** attempt))
+    
+    @staticmethod
+    def _never_connected(error):
+        """
+        Tell whether a requests ConnectionError happened before the request was sent
+        
+        Args:
+            error (requests.exceptions.ConnectionError): The error raised by the POST
+        
+        Returns:
+            bool: True for connect timeouts and failures to open the connection
+                (including DNS failures), False for errors after it was open
+        """
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        # requests wraps urllib3's MaxRetryError, whose reason is the underlying error
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, 'reason', reason)
+        # NameResolutionError is a NewConnectionError
+        return isinstance(reason, NewConnectionError)
+    
+    def _post_with_retry(self, url, body, headers, auth, event_type=None):
+        """
+        POST a notification, retrying failed connections, 429 and 5xx
+        
+        Read timeouts and connections dropped after sending are not retried:
+        the server may already have accepted the POST, and sending it again
+        would push a duplicate. Other responses,
+        including auth failures and unknown topics, are returned straight away.
+        Attempts and waits together stay within RETRY_BUDGET seconds.
+        
+        Returns:
+            requests.Response: The last response received
+        """
+        correlation_id = f"{self.topic}:{event_type}"
+        deadline = time.monotonic() + self.RETRY_BUDGET
+        for attempt in range(self.MAX_ATTEMPTS):
+            is_last = attempt == self.MAX_ATTEMPTS - 1
+            # Never let a single attempt run past the budget
+            remaining = max(deadline - time.monotonic(), 0.1)
+            timeout = (min(self._timeout[0], remaining), min(self._timeout[1], remaining))
+            try:
+                response = get_session().post(
+                    url,
+                    data=body,
+                    headers=headers,
+                    auth=auth,
+                    timeout=timeout
+                )
+            except requests.exceptions.ConnectionError as e:
+                # Only retry when the request never left: a reset after sending may
+                # mean ntfy already accepted it
+                if not self._never_connected(e):
+                    raise
+                delay = self._retry_delay(attempt)
+                # Give up if the wait would leave no time to even connect again
+                if is_last or time.monotonic() + delay + self._timeout[0] > deadline:
+                    raise
+                logger.info(f"Ntfy {correlation_id}: attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                if is_last or response.status_code not in self.RETRY_STATUSES:
+                    return response
+                delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                if time.monotonic() + delay + self._timeout[0] > deadline:
+                    return response
+                logger.info(f"Ntfy {correlation_id}: attempt {attempt + 1} got HTTP {response.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+    
     def _get_tag_for_event(self, event_type):
         """Map event types to appropriate Ntfy tags"""
-        event_tags = {
-            "ONLINE": "white_check_mark",
-            "ONBATT": "battery",
-            "LOWBATT": "warning,battery",
-            "COMMOK": "signal_strength",
-            "COMMBAD": "no_mobile_phones",
-            "SHUTDOWN": "sos,warning",
-            "REPLBATT": "wrench,battery",
-            "NOCOMM": "no_entry,warning",
-            "NOPARENT": "ghost"
-        }
-        return event_tags.get(event_type, "")
+        return EVENT_TAGS.get(event_type, "")
 
 def _get_server_name():
     """Get the server name from database without fallback"""
@@ -117,7 +253,7 @@ def _get_server_name():
         
         # Get server name directly from the database
         server_name = InitialSetupModel.get_server_name()
-        logger.debug(f"Ntfy using server name: {server_name}")
+        logger.debug("Ntfy using server name: %s", server_name)
         return server_name
     except Exception as e:
         logger.error(f"Failed to get server name in Ntfy: {str(e)}")
@@ -143,22 +279,10 @@ def test_notification(config, event_type=None):
         
         notifier = NtfyNotifier(config)
         
-        event_messages = {
-            "ONLINE": "Your UPS is now running on line power",
-            "ONBATT": "Your UPS has switched to battery power",
-            "LOWBATT": "Warning: UPS battery is running low",
-            "COMMOK": "Communication with UPS has been restored",
-            "COMMBAD": "Communication with UPS has been lost",
-            "SHUTDOWN": "System shutdown is imminent due to low battery",
-            "REPLBATT": "UPS battery needs replacement",
-            "NOCOMM": "Cannot communicate with the UPS",
-            "NOPARENT": "Parent process has been lost"
-        }
-        
         # Include server_name in title (more prominently)
         title = f"[{server_name}] Test Notification"
         if event_type:
-            message = event_messages.get(event_type, f"Test notification for {event_type} event")
+            message = TEST_MESSAGES.get(event_type, f"Test notification for {event_type} event")
             title = f"[{server_name}] Test: {event_type}"
         else:
             message = "This is a test notification from Nutify"
@@ -193,12 +317,12 @@ def send_event_notification(event_type, message):
         configs_with_event = NtfyConfig.query.filter(getattr(NtfyConfig, field_name) == True).all()
         
         if not configs_with_event:
-            logger.debug(f"No Ntfy configurations have {event_type} notification enabled")
+            logger.debug("No Ntfy configurations have %s notification enabled", event_type)
             return {"success": False, "message": f"No configurations have {event_type} notification enabled"}
         
         # Use the first config that has this event type enabled
         config_obj = configs_with_event[0]
-        logger.debug(f"Using Ntfy config ID {config_obj.id} (server: {config_obj.server}) for {event_type} notification")
+        logger.debug("Using Ntfy config ID %s (server: %s) for %s notification", config_obj.id, config_obj.server, event_type)
         
         # Convert to dictionary for the notifier
         config = config_obj.to_dict()
@@ -216,23 +340,11 @@ def send_event_notification(event_type, message):
         # Send notification
         notifier = NtfyNotifier(config)
         
-        event_titles = {
-            "ONLINE": "UPS Online",
-            "ONBATT": "UPS On Battery",
-            "LOWBATT": "UPS Low Battery",
-            "COMMOK": "UPS Communication Restored",
-            "COMMBAD": "UPS Communication Lost",
-            "SHUTDOWN": "System Shutdown Imminent",
-            "REPLBATT": "UPS Battery Replacement Needed",
-            "NOCOMM": "UPS Not Reachable",
-            "NOPARENT": "Parent Process Lost"
-        }
-        
         # Add server_name to the title in a more prominent way
-        base_title = event_titles.get(event_type, f"UPS Event: {event_type}")
+        base_title = EVENT_TITLES.get(event_type, f"UPS Event: {event_type}")
         title = f"[{server_name}] {base_title}"
         
-        logger.debug(f"Sending event notification for {event_type} with config ID {config_obj.id}, server: {config_obj.server}")
+        logger.debug("Sending event notification for %s with config ID %s, server: %s", event_type, config_obj.id, config_obj.server)
         return notifier.send_notification(title, message, event_type)
         
     except Exception as e:
@@ -16,10 +16,12 @@ WebhookConfig = None
 
 # Try to get the WebhookConfig model from db.ModelClasses
 def get_webhook_model():
-    """Get the WebhookConfig model from db.ModelClasses"""
+    """Get the WebhookConfig model from db.ModelClasses, resolving it only once"""
+    global WebhookConfig
+    if WebhookConfig is not None:
+        return WebhookConfig
     try:
         from app import db
-        global WebhookConfig
         if hasattr(db, 'ModelClasses') and hasattr(db.ModelClasses, 'WebhookConfig'):
             WebhookConfig = db.ModelClasses.WebhookConfig
             logger.info("✅ Webhook model loaded from central DB registry")
@@ -4,6 +4,7 @@ Webhook notification system for UPS events.
 
 # import requests # No longer needed
 import json
+import functools
 import logging
 import urllib3
 from flask import current_app
@@ -16,6 +17,8 @@ import time
 import hmac
 import hashlib
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib3.exceptions import InsecureRequestWarning
 import urllib.parse
 
@@ -40,12 +43,69 @@ def _get_server_name():
         
         # Get server name directly from the database
         server_name = InitialSetupModel.get_server_name()
-        logger.debug(f"Webhook using server name: {server_name}")
+        logger.debug("Webhook using server name: %s", server_name)
         return server_name
     except Exception as e:
         logger.error(f"Failed to get server name in Webhook: {str(e)}")
         raise  # Re-raise the error rather than providing a fallback
 
+# Supported payload signing algorithms; anything else falls back to SHA-256
+SIGNING_ALGORITHMS = {
+    'sha256': hashlib.sha256,
+    'sha512': hashlib.sha512
+}
+
+@functools.lru_cache(maxsize=None)
+def _build_ssl_context(verify_param, ca_mtime=None):
+    """
+    Build the SSL context for a 'verify' setting once and reuse it
+    
+    Loading the system CA store is the expensive part of every HTTPS request,
+    and webhooks sharing a setting can share the same context. A CA bundle
+    that fails to load raises, and lru_cache does not cache exceptions.
+    
+    Args:
+        verify_param (bool|str): False to skip verification, a CA bundle path,
+            or True for the system CA certificates
+        ca_mtime (float, optional): Modification time of the CA bundle, so an
+            updated file gets a fresh context
+            
+    Returns:
+        ssl.SSLContext: Context to pass to urlopen
+    """
+    ssl_context = ssl.create_default_context()
+    if not verify_param: # verify_ssl is False
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+        logger.warning("urllib: Disabling SSL certificate verification.")
+    elif isinstance(verify_param, str): # custom_ca_cert path
+        ssl_context.load_verify_locations(cafile=verify_param)
+        logger.info(f"urllib: Using custom CA certificate: {verify_param}")
+    # Else (verify_param is True), use default context
+    return ssl_context
+
+def _get_ssl_context(verify_param):
+    """
+    Get the SSL context for a 'verify' setting, falling back to default
+    verification when the custom CA bundle cannot be loaded
+    
+    Args:
+        verify_param (bool|str): False to skip verification, a CA bundle path,
+            or True for the system CA certificates
+            
+    Returns:
+        ssl.SSLContext: Context to pass to urlopen
+    """
+    if not isinstance(verify_param, str):
+        return _build_ssl_context(verify_param)
+    try:
+        return _build_ssl_context(verify_param, os.stat(verify_param).st_mtime)
+    except FileNotFoundError:
+        logger.error(f"urllib: Custom CA certificate not found: {verify_param}. Falling back to default verification.")
+    except Exception as ssl_err:
+        logger.error(f"urllib: Error loading custom CA certificate: {ssl_err}. Falling back to default verification.")
+    return _build_ssl_context(True)
+
 class WebhookNotifier:
     def __init__(self, config):
         self.config = config
@@ -77,6 +137,7 @@ class WebhookNotifier:
         self.signing_secret = config.get('signing_secret', '')
         self.signing_header = config.get('signing_header', 'X-Nutify-Signature')
         self.signing_algorithm = config.get('signing_algorithm', 'sha256')
+        self._hmac = None  # keyed HMAC, built on first signature
         
         # Testing options
         self.ignore_response_errors = config.get('ignore_response_errors', False)
@@ -124,7 +185,7 @@ class WebhookNotifier:
             signature = self._generate_signature(payload_str)
             if signature:
                 headers[self.signing_header] = signature
-                logger.debug(f"Added payload signature to {self.signing_header} header")
+                logger.debug("Added payload signature to %s header", self.signing_header)
             
         # Add custom headers
         if self.custom_headers:
@@ -147,21 +208,15 @@ class WebhookNotifier:
                 logger.warning("Signature generation failed: No signing secret provided")
                 return None
                 
-            # Convert string to bytes
-            message = payload_str.encode('utf-8')
-            secret = self.signing_secret.encode('utf-8')
-            
-            # Choose algorithm
-            if self.signing_algorithm == 'sha256':
-                hash_func = hashlib.sha256
-            elif self.signing_algorithm == 'sha512':
-                hash_func = hashlib.sha512
-            else:
-                hash_func = hashlib.sha256  # Default to SHA-256
+            # Key the HMAC once per notifier; each payload starts from a copy
+            if self._hmac is None:
+                self._hmac = hmac.new(self.signing_secret.encode('utf-8'), None, SIGNING_ALGORITHMS.get(self.signing_algorithm, hashlib.sha256))
             
             # Create signature
-            signature = hmac.new(secret, message, hash_func).hexdigest()
-            logger.debug(f"Generated {self.signing_algorithm} signature for payload")
+            signer = self._hmac.copy()
+            signer.update(payload_str.encode('utf-8'))
+            signature = signer.hexdigest()
+            logger.debug("Generated %s signature for payload", self.signing_algorithm)
             
             return signature
         except Exception as e:
@@ -372,19 +427,18 @@ class WebhookNotifier:
         # Initialize variables
         request_headers = {}
         payload = {}
-        json_data, data, payload_str = None, None, None
+        payload_str = None
         auth = None
         verify_param = True
         
         try:
             # --- Prepare payload, initial headers, auth, verify param ---
             payload = self._prepare_payload(event_type, event_data or {}, custom_payload)
+            # Serialize once: the signature covers exactly the bytes that are sent
             if self.content_type == 'application/json':
-                json_data = payload
                 payload_str = json.dumps(payload, separators=(',', ':'))
             else:
                 payload_str = json.dumps(payload)
-                data = payload_str
             headers = self._prepare_headers(payload_str)
             auth = self._get_auth()
             verify_param = self._get_ssl_verify_param()
@@ -409,32 +463,13 @@ class WebhookNotifier:
                 auth_bytes = base64.b64encode(auth_str.encode('utf-8'))
                 req.add_header('Authorization', f'Basic {auth_bytes.decode("utf-8")}')
                 
-            # Prepare data payload
-            request_data = None
-            if data:
-                request_data = data.encode('utf-8') # urllib expects bytes
-            elif json_data:
-                request_data = json.dumps(json_data).encode('utf-8')
-                if not req.get_header('Content-type'): # Ensure content-type is set for JSON
-                    req.add_header('Content-type', 'application/json')
+            # Prepare data payload; Content-Type is already set by _prepare_headers
+            request_data = payload_str.encode('utf-8') # urllib expects bytes
                     
             # Handle SSL verification
             ssl_context = None
             if self.url.startswith('https'):
-                ssl_context = ssl.create_default_context()
-                if not verify_param: # verify_ssl is False
-                    ssl_context.check_hostname = False
-                    ssl_context.verify_mode = ssl.CERT_NONE
-                    logger.warning("urllib: Disabling SSL certificate verification.")
-                elif isinstance(verify_param, str): # custom_ca_cert path
-                    try:
-                        ssl_context.load_verify_locations(cafile=verify_param)
-                        logger.info(f"urllib: Using custom CA certificate: {verify_param}")
-                    except FileNotFoundError:
-                        logger.error(f"urllib: Custom CA certificate not found: {verify_param}. Falling back to default verification.")
-                    except Exception as ssl_err:
-                        logger.error(f"urllib: Error loading custom CA certificate: {ssl_err}. Falling back to default verification.")
-                # Else (verify_param is True), use default context
+                ssl_context = _get_ssl_context(verify_param)
                 
             # Make the request
             response = None
@@ -598,32 +633,69 @@ def get_ups_info(ups_name=None):
             'input_voltage': '0V'
         }
 
-def send_event_notification(event_type, ups_name=None):
+# Upper bound on concurrent webhook POSTs for one event
+WEBHOOK_MAX_WORKERS = 8
+
+# WebhookNotifier per webhook id, with the configuration it was built from
+_notifier_cache = {}
+_notifier_cache_lock = threading.Lock()
+
+def get_notifier(webhook_config):
+    """
+    Get a WebhookNotifier for a configuration, reusing it while the configuration is unchanged
+    
+    Keeps parsed custom headers and the keyed HMAC across events.
+    
+    Args:
+        webhook_config (dict): Webhook configuration
+        
+    Returns:
+        WebhookNotifier: Notifier for the configuration
+    """
+    webhook_id = webhook_config.get('id')
+    if webhook_id is None:
+        return WebhookNotifier(webhook_config)
+    
+    config_key = json.dumps(webhook_config, sort_keys=True, default=str)
+    with _notifier_cache_lock:
+        cached = _notifier_cache.get(webhook_id)
+        if cached and cached[0] == config_key:
+            return cached[1]
+        notifier = WebhookNotifier(webhook_config)
+        _notifier_cache[webhook_id] = (config_key, notifier)
+        return notifier
+
+def send_event_notification(event_type, ups_name=None, webhooks=None, ups_info=None):
     """
     Send webhook notifications for a UPS event
     
     Args:
         event_type (str): Event type (ONLINE, ONBATT, etc.)
         ups_name (str, optional): Name of the UPS. Defaults to None.
+        webhooks (list, optional): Configurations to send to. Defaults to all
+            webhooks enabled for the event.
+        ups_info (dict, optional): UPS data already read by the caller.
+            Defaults to reading it with get_ups_info.
         
     Returns:
         dict: Response with success status
     """
     try:
-        from core.extranotifs.webhook.db import get_enabled_configs_for_event
+        # Get webhooks enabled for this event before gathering any event data
+        if webhooks is None:
+            from core.extranotifs.webhook.db import get_enabled_configs_for_event
+            webhooks = get_enabled_configs_for_event(event_type)
+        
+        if not webhooks:
+            logger.debug("No webhooks enabled for event %s", event_type)
+            return {'success': False, 'message': 'No webhooks enabled for this event'}
         
         # Get server name
         server_name = _get_server_name()
         
-        # Get UPS information
-        ups_info = get_ups_info(ups_name)
-        
-        # Get webhooks enabled for this event
-        webhooks = get_enabled_configs_for_event(event_type)
-        
-        if not webhooks:
-            logger.debug(f"No webhooks enabled for event {event_type}")
-            return {'success': False, 'message': 'No webhooks enabled for this event'}
+        # Get UPS information unless the caller already has it
+        if ups_info is None:
+            ups_info = get_ups_info(ups_name)
         
         # Prepare event data
         event_data = {
@@ -632,29 +704,38 @@ def send_event_notification(event_type, ups_name=None):
             'server_name': server_name  # Include server_name in event data
         }
         
-        # Send to all enabled webhooks
-        results = []
-        for webhook_config in webhooks:
+        # Send to all enabled webhooks side by side; each POST is mostly network wait,
+        # so the slowest webhook bounds the total instead of the sum of all of them
+        app = current_app._get_current_object()
+        
+        def send_to_webhook(webhook_config):
             try:
                 # Add server_name to each webhook config
                 webhook_config['server_name'] = server_name
                 
-                notifier = WebhookNotifier(webhook_config)
-                result = notifier.send_notification(event_type, event_data)
-                results.append({
+                notifier = get_notifier(webhook_config)
+                with app.app_context():
+                    result = notifier.send_notification(event_type, event_data)
+                return {
                     'webhook_id': webhook_config.get('id'),
                     'webhook_name': webhook_config.get('name'),
                     'success': result.get('success'),
                     'message': result.get('message')
-                })
+                }
             except Exception as e:
                 logger.error(f"Error sending to webhook {webhook_config.get('id')}: {str(e)}")
-                results.append({
+                return {
                     'webhook_id': webhook_config.get('id'),
                     'webhook_name': webhook_config.get('name'),
                     'success': False,
                     'message': str(e)
-                })
+                }
+        
+        if len(webhooks) == 1:
+            results = [send_to_webhook(webhooks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(webhooks), WEBHOOK_MAX_WORKERS), thread_name_prefix="webhook") as executor:
+                results = list(executor.map(send_to_webhook, webhooks))
         
         # Consider successful if at least one webhook was sent successfully
         success = any(result.get('success') for result in results)
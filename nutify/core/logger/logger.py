@@ -1,8 +1,11 @@
 # Log level: DEBUG, INFO, WARNING, ERROR, CRITICAL
 
 import os
+import atexit
 import logging
 import logging.config
+import logging.handlers
+import queue
 import re
 from core.settings import LOG, LOG_LEVEL, LOG_FILE
 
@@ -296,9 +299,43 @@ LOGGING_CONFIG = {
     }
 }
 
+# Loggers whose records are written by a background listener thread instead of
+# the calling (request) thread
+QUEUED_LOGGERS = ('events',)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that hands the record over untouched.
+    
+    The standard QueueHandler formats the message and the exc_info traceback
+    before enqueueing; here all formatting is left to the listener's handlers.
+    """
+    
+    def prepare(self, record):
+        return record
+
+def _queue_logger_handlers(name):
+    """Move a logger's handlers behind a queue served by a QueueListener thread"""
+    target_logger = logging.getLogger(name)
+    handlers = list(target_logger.handlers)
+    if not handlers:
+        return None
+    
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        target_logger.removeHandler(handler)
+    target_logger.addHandler(DeferredQueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
 def setup_logging():
     """Initialize logging configuration using dictConfig."""
     logging.config.dictConfig(LOGGING_CONFIG)
+    for name in QUEUED_LOGGERS:
+        _queue_logger_handlers(name)
 
 def get_logger(category, name=None):
     """
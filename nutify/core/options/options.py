@@ -82,8 +82,15 @@ def backup_database():
         db.session.remove()
         db.engine.dispose()
         
-        # Copy database file
-        shutil.copy2(db_path, backup_path)
+        # Use SQLite's online backup: in WAL mode recent commits may still be
+        # in the -wal file, which a plain file copy would miss
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(backup_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
         
         return backup_path
         
@@ -90,6 +90,9 @@ from .paths import (
     # Network port
     NUT_PORT,
     
+    # UPS data polling mode
+    UPSC_USE_SUBPROCESS,
+    
     # NUT PID files
     NUT_DRIVER_PID,
     NUT_UPSD_PID,
@@ -193,6 +196,7 @@ __all__ = [
     'NUT_STATE_DIR',
     'NUT_DRIVER_DIR',
     'NUT_PORT',
+    'UPSC_USE_SUBPROCESS',
     'NUT_DRIVER_PID',
     'NUT_UPSD_PID',
     'NUT_UPSMON_PID',
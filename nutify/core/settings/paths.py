@@ -72,6 +72,7 @@ def load_path_settings():
         settings['NUT_RUN_DIR'] = '/var/run/nut'
         settings['NUT_LOG_DIR'] = '/var/log/nut'
         settings['NUT_PORT'] = 3493
+        settings['UPSC_USE_SUBPROCESS'] = 0
         # Default mail path settings
         settings['MSMTP_PATH'] = '/usr/bin/msmtp'
         settings['TLS_CERT_PATH'] = '/etc/ssl/certs/ca-certificates.crt'
@@ -91,6 +92,9 @@ def load_path_settings():
                     key = key.strip()
                     settings[key] = parse_value(value)
     
+    # Default to the persistent NUT socket session for UPS data polling
+    settings.setdefault('UPSC_USE_SUBPROCESS', 0)
+    
     # If NUT_DRIVER_DIR is not set, use a default value
     if not settings.get('NUT_DRIVER_DIR'):
         settings['NUT_DRIVER_DIR'] = '/usr/lib/nut'  # Default NUT driver directory
@@ -1,5 +1,6 @@
 from .upsmon_client import (
     handle_nut_event,
+    handle_nut_events,
     get_event_history,
     get_events_table,
     acknowledge_event,
@@ -11,6 +12,7 @@ from .routes_upsmon import routes_upsmon
 
 __all__ = [
     'handle_nut_event',
+    'handle_nut_events',
     'get_event_history',
     'get_events_table',
     'acknowledge_event',
@@ -40,76 +40,111 @@ def handle_nut_event(app, data):
         app: Flask application instance
         data: Dictionary containing ups and event
     """
+    return handle_nut_events(app, [data])
+
+def handle_nut_events(app, events, received_at=None):
+    """
+    Handles a batch of NUT events, storing them in a single database transaction
+    
+    Events that are not valid are logged and skipped, so they cannot roll
+    back the rest of the batch.
+    
+    Args:
+        app: Flask application instance
+        events: List of dictionaries containing ups and event
+        received_at: Optional list of the times each event was received,
+            in the same order as events. Defaults to the current time.
+        
+    Returns:
+        bool: True if the events were processed, False otherwise
+    """
     try:
-        logger.info(f"Processing NUT event: {data}")
+        # Unwrap the current_app proxy once so attribute access below is direct
+        if hasattr(app, '_get_current_object'):
+            app = app._get_current_object()
         
-        if not data:
-            logger.error("No data received")
-            return False
-            
-        ups = data.get('ups', 'unknown')
-        event = data.get('event', 'unknown')
+        logger.info(f"Processing {len(events)} NUT event(s): {events}")
         
         # Use CACHE_TIMEZONE from the Flask app
         tz = app.CACHE_TIMEZONE
-        now = datetime.now(tz)
+        if received_at is None:
+            received_at = [datetime.now(tz)] * len(events)
         
         # Ensure UPSEvent is initialized
         _init_models_if_needed()
         
+        # Build each event on its own, so one bad payload only loses itself
+        valid_events = []
+        db_events = []
+        for data, event_time in zip(events, received_at):
+            try:
+                if not data or not isinstance(data, dict):
+                    raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+                db_events.append(UPSEvent(
+                    ups_name=str(data.get('ups', 'unknown')),
+                    event_type=str(data.get('event', 'unknown')),
+                    event_message=str(data),
+                    timestamp_utc=event_time,
+                    timestamp_utc_begin=event_time,
+                    source_ip=None,
+                    acknowledged=False
+                ))
+                valid_events.append(data)
+            except Exception as e:
+                logger.error(f"Skipping invalid NUT event {data!r}: {str(e)}")
+        
+        events = valid_events
+        if not events:
+            logger.error("No data received")
+            return False
+        
         # Save in the database
         with data_lock:
-            db_event = UPSEvent(
-                ups_name=ups,
-                event_type=event,
-                event_message=str(data),
-                timestamp_utc=now,
-                timestamp_utc_begin=now,
-                source_ip=None,
-                acknowledged=False
-            )
-            db.session.add(db_event)
+            db.session.add_all(db_events)
+            db.session.flush()
+            
+            # Handle related events (e.g. ONLINE after ONBATT), in arrival order:
+            # only ONBATT events stored before the ONLINE event can be closed by it
+            for db_event in db_events:
+                if db_event.event_type != 'ONLINE':
+                    continue
+                prev_event = UPSEvent.query.filter(
+                    UPSEvent.event_type == 'ONBATT',
+                    UPSEvent.timestamp_utc_end.is_(None),
+                    UPSEvent.id < db_event.id
+                ).order_by(UPSEvent.timestamp_utc.desc()).first()
+                
+                if prev_event:
+                    prev_event.timestamp_utc_end = db_event.timestamp_utc
+                    logger.debug("Closed previous ONBATT event")
+            
             db.session.commit()
-            logger.info(f"Event saved to database with id: {db_event.id}")
+            logger.info(f"Events saved to database with ids: {[db_event.id for db_event in db_events]}")
         
         # Save in the app memory for the events page
         if not hasattr(app, 'events_log'):
             app.events_log = []
-        app.events_log.append(data)
-        
-        # Send via websocket
-        if hasattr(app, 'socketio'):
-            app.socketio.emit('nut_event', data)
-            logger.debug("Event sent via WebSocket")
-        
-        # Handle email notification
-        try:
-            from ..mail import handle_notification
-            handle_notification(data)  # Pass the event to mail.py
-            logger.info("Email notification sent")
-        except Exception as e:
-            logger.error(f"Error sending email: {str(e)}")
-        
-        # Handle related events (e.g. ONLINE after ONBATT)
-        if event == 'ONLINE':
-            # Ensure UPSEvent is initialized
-            _init_models_if_needed()
+        app.events_log.extend(events)
+        
+        for data in events:
+            # Send via websocket
+            if hasattr(app, 'socketio'):
+                app.socketio.emit('nut_event', data)
+                logger.debug("Event sent via WebSocket")
             
-            with data_lock:
-                prev_event = UPSEvent.query.filter_by(
-                    event_type='ONBATT',
-                    timestamp_utc_end=None
-                ).order_by(UPSEvent.timestamp_utc.desc()).first()
-                
-                if prev_event:
-                    prev_event.timestamp_utc_end = now
-                    db.session.commit()
-                    logger.debug("Closed previous ONBATT event")
+            # Handle email notification
+            try:
+                from ..mail import handle_notification
+                handle_notification(data)  # Pass the event to mail.py
+                logger.info("Email notification sent")
+            except Exception as e:
+                logger.error(f"Error sending email: {str(e)}")
         
         return True
         
     except Exception as e:
-        logger.error(f"Error handling NUT event: {str(e)}", exc_info=True)
+        logger.error(f"Error handling NUT events: {str(e)}", exc_info=True)
+        db.session.rollback()
         return False
 
 def get_event_history(app):